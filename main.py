@@ -9,6 +9,7 @@ import os
 os.environ["OPENCV_VIDEOIO_MMAP_ENABLE"] = "0"  # Impede erros de sincronização de threads
 
 import sys
+import cv2
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QCoreApplication, Qt
 from src.ui import VideoHeatmapApp
@@ -30,6 +31,9 @@ def main():
     # Aumentar prioridade do processo
     increase_process_priority()
     
+    # Usar todos os núcleos nas funções paralelizadas do OpenCV
+    cv2.setNumThreads(os.cpu_count() or 1)
+    
     # Habilitar cache de OpenGL para melhorar renderização
     QCoreApplication.setAttribute(Qt.AA_UseDesktopOpenGL)
     QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
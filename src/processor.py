@@ -1,33 +1,174 @@
 import cv2
 import numpy as np
-import matplotlib.cm as cm
-from matplotlib.colors import Normalize
 import time
+import queue
+import threading
+from collections import OrderedDict
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # Numba é opcional: sem ele, usa-se o caminho NumPy
+
+try:
+    import av
+except ImportError:
+    av = None  # PyAV é opcional: sem ele, a análise decodifica com o OpenCV
+
+# Esquemas de cores disponíveis (nome -> constante do OpenCV)
+COLORMAPS = {
+    'hot': cv2.COLORMAP_HOT,
+    'jet': cv2.COLORMAP_JET,
+    'inferno': cv2.COLORMAP_INFERNO,
+    'plasma': cv2.COLORMAP_PLASMA,
+    'viridis': cv2.COLORMAP_VIRIDIS,
+}
+
+if njit is not None:
+    # Serial: a composição roda na thread de composição (QThread), onde uma região
+    # paralela do Numba pode travar ou abortar o processo. Sem o GIL, a thread da
+    # interface segue livre durante a mistura
+    @njit(fastmath=True, cache=True, nogil=True)
+    def _blend_kernel(frame, colored, alpha, out):
+        """Mistura frame e heatmap colorido pixel a pixel em uma única passada"""
+        height, width = alpha.shape
+        for y in range(height):
+            for x in range(width):
+                a = np.uint16(alpha[y, x])
+                for c in range(3):
+                    v = (np.uint16(frame[y, x, c]) * (255 - a) +
+                         np.uint16(colored[y, x, c]) * a + 128)
+                    # Divisão exata por 255 com deslocamentos
+                    out[y, x, c] = np.uint8((v + (v >> 8)) >> 8)
+                    
+    # Serial: é chamado da thread de detecção, e regiões paralelas do Numba lançadas fora
+    # da thread principal podem travar o encerramento do processo (camada TBB). Libera o
+    # GIL para que a interface continue respondendo enquanto a passada roda
+    @njit(fastmath=True, cache=True, nogil=True)
+    def _diff_threshold_kernel(cur, prev, threshold, out):
+        """Diferença absoluta e limiar em uma única passada; retorna o número de pixels ativos"""
+        height, width = cur.shape
+        changed = 0
+        for y in range(height):
+            row = 0
+            for x in range(width):
+                active = abs(np.int16(cur[y, x]) - np.int16(prev[y, x])) > threshold
+                out[y, x] = 255 if active else 0
+                row += active
+            changed += row
+        return changed
+        
+    # Pré-compilar os kernels na importação, com arrays mínimos dos mesmos tipos usados
+    # depois: a compilação JIT não cai na primeira busca ou detecção da interface
+    _blend_kernel(np.zeros((1, 1, 3), np.uint8), np.zeros((1, 1, 3), np.uint8),
+                  np.zeros((1, 1), np.uint8), np.zeros((1, 1, 3), np.uint8))
+    _diff_threshold_kernel(np.zeros((1, 1), np.uint8), np.zeros((1, 1), np.uint8), 15,
+                           np.zeros((1, 1), np.uint8))
+else:
+    _blend_kernel = None
+    _diff_threshold_kernel = None
 
 class VideoHeatmapProcessor:
     """Classe responsável pelo processamento do vídeo e geração do heatmap baseado em cursor"""
     
-    def __init__(self, decay_factor=0.95, blur_size=15):
+    def __init__(self, decay_factor=1.0, blur_size=15, frame_cache_size=16):
         self.decay_factor = decay_factor
         self.blur_size = blur_size
         self.cap = None
+        self.video_path = None
+        # Serializa o uso da captura e dos buffers de composição entre as threads (interface,
+        # composição e leitura da detecção)
+        self.lock = threading.Lock()
+        # Incrementado a cada leitura de get_frame_at_time na captura: a leitura da detecção
+        # percebe que a posição foi movida e reposiciona antes do próximo frame
+        self._cap_moves = 0
         self.width = 0
         self.height = 0
         self.colormap = 'hot'
+        self._colormap_id = cv2.COLORMAP_HOT  # Constante do OpenCV resolvida em set_colormap
+        
+        # Para armazenar os movimentos do cursor com timestamps: arrays paralelos (SoA)
+        # com crescimento geométrico, preenchidos em ordem crescente de tempo
+        self._n_positions = 0
+        self._ts = np.empty(4096, dtype=np.float64)
+        self._xs = np.empty(4096, dtype=np.int32)
+        self._ys = np.empty(4096, dtype=np.int32)
         
-        # Para armazenar os movimentos do cursor com timestamps
-        self.cursor_positions = []  # Lista de (timestamp, x, y)
         self.video_duration = 0
         self.start_time = 0
         self.current_frame_pos = 0
         self.total_frames = 0
         self.fps = 0
         
+        # Cache LRU dos últimos frames decodificados (índice do frame -> frame)
+        self.frame_cache_size = frame_cache_size
+        self._frame_cache = OrderedDict()
+        
+        # O heatmap é acumulado e suavizado em resolução reduzida (1/_hm_scale) e só é
+        # ampliado para o tamanho do frame na composição
+        self._hm_scale = 4
+        
+        # Contagens (com decaimento) acumuladas para o intervalo de posições [início, fim)
+        # do último heatmap gerado, permitindo atualizá-lo só com as amostras novas
+        self._hm_counts = None
+        self._hm_range = None
+        self._hm_decay = None
+        self._hm_params = None
+        
+        # Kernel gaussiano 1D do espalhamento, recalculado só quando blur_size ou a
+        # resolução mudam
+        self._spread_disk = None
+        self._spread_kernel = None
+        self._spread_kernel_key = None
+        
+        # Buffers persistentes reutilizados a cada chamada (alocados em open_video)
+        self._heatmap = None
+        self._heatmap_full = None
+        self._colored_bgr = None
+        self._norm = None
+        self._alpha = None
+        self._alpha_inv = None
+        self._blend = None
+        self._blend_tmp = None
+        self._blend_tmp2 = None
+        
+        # Estado da detecção de cursor (frame anterior em cinza e buffers de trabalho)
+        self._morph_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._gray_bufs = None
+        self._diff_buf = None
+        self._thresh_buf = None
+        self._morph_buf = None
+        self._prev_gray = None
+        self._raw_bufs = None
+        self._prev_raw = None
+        
+    def _allocate_heatmap_buffer(self):
+        """Aloca o buffer do heatmap em resolução reduzida para as dimensões do vídeo"""
+        scale = self._hm_scale
+        self._heatmap = np.empty(((self.height + scale - 1) // scale, (self.width + scale - 1) // scale),
+                                 dtype=np.uint16)
+        self._hm_counts = np.zeros(self._heatmap.size, dtype=np.float64)
+        self._hm_range = None
+        
+    def _allocate_buffers(self, height, width):
+        """Aloca os buffers de composição para as dimensões de frame informadas"""
+        self._heatmap_full = np.empty((height, width), dtype=np.uint16)
+        self._colored_bgr = np.empty((height, width, 3), dtype=np.uint8)
+        self._norm = np.empty((height, width), dtype=np.uint8)
+        self._alpha = np.empty((height, width), dtype=np.uint8)
+        self._blend = np.empty((height, width, 3), dtype=np.uint8)
+        if _blend_kernel is None:
+            self._alpha_inv = np.empty((height, width), dtype=np.uint8)
+            self._blend_tmp = np.empty((height, width, 3), dtype=np.uint16)
+            self._blend_tmp2 = np.empty((height, width, 3), dtype=np.uint16)
+        
     def open_video(self, source):
         """Abre a fonte de vídeo (arquivo)"""
         if self.cap is not None:
             self.cap.release()
+        self._frame_cache.clear()
             
+        self.video_path = source
         self.cap = cv2.VideoCapture(source)
         if not self.cap.isOpened():
             return False
@@ -42,152 +183,562 @@ class VideoHeatmapProcessor:
             return False
             
         self.height, self.width = frame.shape[:2]
+        self._allocate_heatmap_buffer()
+        self._allocate_buffers(self.height, self.width)
         return True
     
-    def detect_cursor_from_difference(self, frame, prev_frame=None, threshold=15, min_area=3, max_area=500):
+    @property
+    def cursor_positions(self):
+        """Lista de (timestamp, x, y) das posições do cursor detectadas"""
+        ts, xs, ys = self.cursor_position_columns()
+        return list(zip(ts.tolist(), xs.tolist(), ys.tolist()))
+        
+    @property
+    def cursor_positions_array(self):
+        """Array (N, 3) float64 de (timestamp, x, y) das posições do cursor, ordenado por tempo"""
+        ts, xs, ys = self.cursor_position_columns()
+        return np.column_stack((ts, xs, ys))
+        
+    def cursor_position_columns(self):
+        """
+        Retorna (ts, xs, ys) das posições do cursor como arrays NumPy ordenados por tempo
+        (visões dos arrays internos, sem cópia: não devem ser alteradas)
+        """
+        n = self._n_positions
+        return self._ts[:n], self._xs[:n], self._ys[:n]
+        
+    @property
+    def num_cursor_positions(self):
+        """Número de posições do cursor detectadas"""
+        return self._n_positions
+        
+    def count_cursor_positions(self, start_time, end_time):
+        """Número de posições do cursor com start_time <= timestamp <= end_time (busca binária)"""
+        ts = self._ts[:self._n_positions]
+        return int(np.searchsorted(ts, end_time, side='right') - np.searchsorted(ts, start_time, side='left'))
+        
+    def reserve_cursor_positions(self, capacity):
+        """Garante capacidade para capacity posições, evitando realocações durante a análise"""
+        if capacity > self._ts.shape[0]:
+            self._ts = np.resize(self._ts, capacity)
+            self._xs = np.resize(self._xs, capacity)
+            self._ys = np.resize(self._ys, capacity)
+            
+    def clear_cursor_positions(self):
+        """Remove todas as posições do cursor armazenadas"""
+        self._n_positions = 0
+        self._hm_range = None
+        
+    def add_cursor_position(self, timestamp, x, y):
+        """Armazena uma posição do cursor (as chamadas devem vir em ordem crescente de tempo)"""
+        n = self._n_positions
+        if n == self._ts.shape[0]:
+            # Dobrar a capacidade dos buffers
+            capacity = 2 * n
+            self._ts = np.resize(self._ts, capacity)
+            self._xs = np.resize(self._xs, capacity)
+            self._ys = np.resize(self._ys, capacity)
+        self._ts[n] = timestamp
+        self._xs[n] = x
+        self._ys[n] = y
+        self._n_positions = n + 1
+        
+    def interpolate_cursor_positions(self, max_gap):
         """
-        Detecta cursor baseado na diferença entre frames consecutivos com precisão melhorada
-        e redução de falsos positivos
+        Preenche, por interpolação linear, os frames entre posições consecutivas separadas
+        por até max_gap frames (análise com intervalo entre frames). Lacunas maiores indicam
+        frames sem cursor e não são preenchidas.
+        """
+        n = self._n_positions
+        if n < 2 or max_gap <= 1:
+            return
+            
+        ts, xs, ys = self.cursor_position_columns()
+        frame_idx = np.rint(ts * self.fps).astype(np.int64)
+        
+        # Quantos frames cada posição passa a ocupar (ela mesma e os intermediários)
+        gaps = np.diff(frame_idx)
+        counts = np.ones(n, dtype=np.int64)
+        counts[:-1] = np.where((gaps > 1) & (gaps <= max_gap), gaps, 1)
+        total = int(counts.sum())
+        if total == n:
+            return
+            
+        # Índices de frame de todas as posições, incluindo as interpoladas
+        starts = np.cumsum(counts) - counts
+        new_idx = np.repeat(frame_idx, counts) + (np.arange(total) - np.repeat(starts, counts))
+        new_xs = np.rint(np.interp(new_idx, frame_idx, xs)).astype(np.int32)
+        new_ys = np.rint(np.interp(new_idx, frame_idx, ys)).astype(np.int32)
+        
+        self._ts = new_idx / self.fps
+        self._xs = new_xs
+        self._ys = new_ys
+        self._n_positions = total
+        self._hm_range = None
+        
+    def reset_cursor_detection(self):
+        """Descarta o frame anterior usado como referência na detecção do cursor"""
+        self._prev_gray = None
+        self._prev_raw = None
+        
+    def _allocate_detection_buffers(self, height, width):
+        """Aloca os buffers de escala de cinza usados na detecção do cursor"""
+        # Dois buffers alternados: um recebe o frame atual, o outro guarda o anterior
+        # (em cinza antes e depois do blur)
+        self._raw_bufs = (np.empty((height, width), dtype=np.uint8),
+                          np.empty((height, width), dtype=np.uint8))
+        self._gray_bufs = (np.empty((height, width), dtype=np.uint8),
+                           np.empty((height, width), dtype=np.uint8))
+        self._thresh_buf = np.empty((height, width), dtype=np.uint8)
+        self._morph_buf = np.empty((height, width), dtype=np.uint8)
+        if _diff_threshold_kernel is None:
+            self._diff_buf = np.empty((height, width), dtype=np.uint8)
+        self._prev_gray = None
+        self._prev_raw = None
+        
+    def detect_cursor_from_difference(self, frame, threshold=15, min_area=3, max_area=500):
         """
-        if prev_frame is None or frame is None:
+        Detecta cursor baseado na diferença entre o frame e o frame anterior passado à
+        chamada anterior, com precisão melhorada e redução de falsos positivos
+        """
+        if frame is None:
             return -1, -1
             
-        # Converter para escala de cinza
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
+        if self._gray_bufs is None or self._gray_bufs[0].shape != frame.shape[:2]:
+            self._allocate_detection_buffers(frame.shape[0], frame.shape[1])
+            
+        # Converter para escala de cinza nos buffers que não guardam o frame anterior
+        raw = self._raw_bufs[1] if self._prev_raw is self._raw_bufs[0] else self._raw_bufs[0]
+        gray = self._gray_bufs[1] if self._prev_gray is self._gray_bufs[0] else self._gray_bufs[0]
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=raw)
         
-        # Aplicar blur leve para reduzir ruído antes da diferença (melhor redução de ruído)
-        gray = cv2.GaussianBlur(gray, (5, 5), 0)
-        prev_gray = cv2.GaussianBlur(prev_gray, (5, 5), 0)
+        # Pré-filtro antes do blur: se nenhum pixel difere do frame anterior por limiar ou
+        # mais, a diferença após o blur (média 3x3, com arredondamento) não passa do
+        # limiar e a máscara ficaria vazia (vídeo pausado ou cena parada)
+        unchanged = (self._prev_raw is not None and
+                     cv2.norm(raw, self._prev_raw, cv2.NORM_INF) < threshold)
         
-        # Calcular diferença
-        diff = cv2.absdiff(gray, prev_gray)
+        # Aplicar blur leve (caixa 3x3) para reduzir ruído antes da diferença
+        cv2.boxFilter(raw, -1, (3, 3), dst=gray, normalize=True)
         
-        # Aplicar limiar - ajustado para reduzir falsos positivos
-        _, thresh = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)
+        # O frame atual (em cinza, original e suavizado) vira a referência da próxima
+        # chamada, mesmo quando descartado: comparar sempre com o frame imediatamente
+        # anterior evita que mudanças lentas se acumulem até parecer movimento
+        prev_gray = self._prev_gray
+        self._prev_gray = gray
+        self._prev_raw = raw
+        if unchanged or prev_gray is None:
+            return -1, -1
+        
+        # Diferença e limiar (ajustado para reduzir falsos positivos). Se nenhum pixel mudou
+        # acima do limiar, o restante do processamento é dispensado
+        if _diff_threshold_kernel is not None:
+            # Com Numba: as duas etapas fundidas em uma única passada
+            thresh = self._thresh_buf
+            if _diff_threshold_kernel(gray, prev_gray, threshold, thresh) == 0:
+                return -1, -1
+        else:
+            if cv2.norm(gray, prev_gray, cv2.NORM_INF) <= threshold:
+                return -1, -1
+            diff = cv2.absdiff(gray, prev_gray, dst=self._diff_buf)
+            _, thresh = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY, dst=self._thresh_buf)
         
         # Aplicar operações morfológicas para melhorar detecção
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-        thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-        
-        # Encontrar contornos
-        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Filtrar por área e forma - filtros mais restritivos
-        valid_contours = []
-        for c in contours:
-            area = cv2.contourArea(c)
-            if min_area <= area <= max_area:
-                # Calcular circularidade - cursor tende a ser mais circular
-                perimeter = cv2.arcLength(c, True)
-                if perimeter > 0:
-                    circularity = 4 * np.pi * area / (perimeter * perimeter)
-                    # Aumentado o limite de circularidade para reduzir falsos positivos
-                    if circularity > 0.35:  # Valor original era 0.2
-                        # Adicional: verificar compacidade do objeto
-                        x, y, w, h = cv2.boundingRect(c)
-                        aspect_ratio = float(w) / h if h > 0 else 0
-                        # Filtro adicional: cursores geralmente têm proporção próxima de 1:1
-                        if 0.5 <= aspect_ratio <= 2.0:
-                            valid_contours.append((c, area, circularity))
-        
-        if valid_contours:
-            # Ordenar por uma combinação de área e circularidade (priorizar objetos pequenos e circulares)
-            valid_contours.sort(key=lambda x: (x[1] * x[2]), reverse=True)
-            
-            # Pegar o melhor contorno
-            contour = valid_contours[0][0]
-            
-            # Calcular centroide
-            M = cv2.moments(contour)
-            if M["m00"] != 0:
-                cx = int(M["m10"] / M["m00"])
-                cy = int(M["m01"] / M["m00"])
-                return cx, cy
+        opened = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, self._morph_kernel, dst=self._morph_buf)
+        thresh = cv2.morphologyEx(opened, cv2.MORPH_CLOSE, self._morph_kernel, dst=self._thresh_buf)
+        
+        # Restringir a rotulação à região que mudou (bounding box dos pixels ativos)
+        x0, y0, roi_w, roi_h = cv2.boundingRect(thresh)
+        if roi_w == 0 or roi_h == 0:
+            return -1, -1
+        roi = thresh[y0:y0 + roi_h, x0:x0 + roi_w]
+        
+        # Rotular os blobs: área, bounding box e centroide de todos em uma única chamada
+        n_labels, _, stats, centroids = cv2.connectedComponentsWithStats(roi, connectivity=8)
+        if n_labels <= 1:
+            return -1, -1
+            
+        # Ignorar o rótulo 0 (fundo)
+        areas = stats[1:, cv2.CC_STAT_AREA].astype(np.float32)
+        widths = stats[1:, cv2.CC_STAT_WIDTH].astype(np.float32)
+        heights = stats[1:, cv2.CC_STAT_HEIGHT].astype(np.float32)
+        
+        # Filtrar por área e forma com máscaras vetorizadas (sem loop Python por blob)
+        # Compacidade: fração da bounding box preenchida - cursor tende a ser compacto
+        extent = areas / (widths * heights)
+        # Cursores geralmente têm proporção próxima de 1:1
+        aspect_ratio = widths / heights
+        valid = ((areas >= min_area) & (areas <= max_area) & (extent > 0.35) &
+                 (aspect_ratio >= 0.5) & (aspect_ratio <= 2.0))
+        
+        if valid.any():
+            # Priorizar pela combinação de área e compacidade
+            score = np.where(valid, areas * extent, -1.0)
+            best = int(np.argmax(score)) + 1
+            cx, cy = centroids[best]
+            return int(cx) + x0, int(cy) + y0
         
         return -1, -1
         
+    def _read_frames(self, frames, stop, buffers, stride=1):
+        """
+        Lê um a cada stride frames da captura e os coloca na fila (executado em uma thread
+        separada). A decodificação é feita diretamente nos buffers informados, usados em
+        rodízio; os frames pulados só avançam a leitura, sem conversão de cor.
+        """
+        def put(item):
+            # Não bloquear indefinidamente se o consumidor tiver parado
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+            
+        try:
+            if av is None or not self._decode_frames_av(put, stop, stride):
+                index = 0
+                frame_index = 0
+                cap_moves = self._cap_moves
+                while not stop.is_set():
+                    # A captura é compartilhada com a exibição: cada leitura sob o lock
+                    # (fora dele só a entrega à fila, que pode bloquear)
+                    with self.lock:
+                        if self._cap_moves != cap_moves:
+                            # Uma busca da interface moveu a captura: voltar ao frame seguinte
+                            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+                            cap_moves = self._cap_moves
+                        if frame_index % stride:
+                            ret, frame = self.cap.grab(), None
+                        else:
+                            ret, frame = self.cap.read(buffers[index])
+                    if not ret:
+                        break
+                    if frame is not None:
+                        if not put(frame):
+                            break
+                        index = (index + 1) % len(buffers)
+                    frame_index += 1
+        finally:
+            # Sinalizar o fim do vídeo
+            put(None)
+            
+    def _decode_frames_av(self, put, stop, stride=1):
+        """
+        Decodifica o vídeo com o PyAV (decodificador multithread do FFmpeg) e entrega um a
+        cada stride frames, em BGR, a put. Retorna False se o arquivo não puder ser aberto
+        com o PyAV.
+        """
+        try:
+            container = av.open(self.video_path)
+        except (OSError, av.error.FFmpegError):
+            return False
+            
+        with container:
+            if not container.streams.video:
+                return False
+            stream = container.streams.video[0]
+            stream.thread_type = 'AUTO'
+            for frame_index, av_frame in enumerate(container.decode(stream)):
+                if stop.is_set():
+                    break
+                if frame_index % stride == 0 and not put(av_frame.to_ndarray(format='bgr24')):
+                    break
+        return True
+            
+    def analyze_stream(self, threshold=15, min_area=3, max_area=500, stride=1):
+        """
+        Percorre o vídeo desde o início detectando o cursor a cada stride frames e gera tuplas
+        (índice do frame, timestamp, x, y). A decodificação roda em uma thread separada
+        que alimenta uma fila limitada, sobrepondo-se à detecção.
+        """
+        with self.lock:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.reset_cursor_detection()
+        
+        frames = queue.Queue(maxsize=4)
+        stop = threading.Event()
+        
+        # Anel de buffers: um sendo decodificado, até maxsize na fila e um em uso pelo
+        # detector, de modo que nenhum buffer é sobrescrito enquanto ainda é lido
+        buffers = [np.empty((self.height, self.width, 3), dtype=np.uint8)
+                   for _ in range(frames.maxsize + 2)]
+        reader = threading.Thread(target=self._read_frames, args=(frames, stop, buffers, stride),
+                                  daemon=True)
+        reader.start()
+        
+        # Referências locais para evitar buscas de atributos a cada frame
+        get_frame = frames.get
+        detect = self.detect_cursor_from_difference
+        fps = self.fps
+        
+        try:
+            frame_index = 0
+            while True:
+                frame = get_frame()
+                if frame is None:
+                    break
+                    
+                x, y = detect(frame, threshold, min_area, max_area)
+                yield frame_index, frame_index / fps, x, y
+                frame_index += stride
+        finally:
+            stop.set()
+            reader.join()
+            # Resetar o vídeo para o início
+            with self.lock:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        
+    def detect_cursor_positions(self, threshold=15, min_area=3, max_area=500, stride=1, progress=None,
+                                should_stop=None):
+        """
+        Analisa o vídeo inteiro e substitui as posições do cursor armazenadas pelas detectadas,
+        gravando-as diretamente nos arrays. progress, se informado, é chamado com a
+        porcentagem concluída sempre que ela muda. should_stop, se informado, é consultado a
+        cada frame e interrompe a análise (mantendo as posições já detectadas) quando
+        retorna verdadeiro. Retorna o número de posições.
+        """
+        total_frames = self.total_frames
+        self.clear_cursor_positions()
+        # No máximo uma posição por frame analisado: reservar de uma vez
+        self.reserve_cursor_positions(total_frames // stride + 1)
+        ts, xs, ys = self._ts, self._xs, self._ys
+        n = 0
+        last_progress = -1
+        
+        for frame_index, timestamp, x, y in self.analyze_stream(threshold, min_area, max_area, stride):
+            if should_stop is not None and should_stop():
+                break
+                
+            # Armazenar posição se o cursor for detectado
+            if x >= 0 and y >= 0:
+                if n == ts.shape[0]:
+                    # Contagem de frames subestimada pela captura: dobrar a capacidade
+                    self.reserve_cursor_positions(2 * n)
+                    ts, xs, ys = self._ts, self._xs, self._ys
+                ts[n] = timestamp
+                xs[n] = x
+                ys[n] = y
+                n += 1
+                
+            if progress is not None and total_frames > 0:
+                percent = min(100, int(((frame_index + 1) / total_frames) * 100))
+                if percent != last_progress:
+                    progress(percent)
+                    last_progress = percent
+        else:
+            # Com stride > 1 o último frame analisado pode ficar antes do fim do vídeo:
+            # concluir a barra de progresso ao terminar sem interrupção
+            if progress is not None and last_progress != 100:
+                progress(100)
+                    
+        self._n_positions = n
+        
+        # Preencher por interpolação os frames pulados entre detecções consecutivas
+        if stride > 1:
+            self.interpolate_cursor_positions(stride)
+        return self._n_positions
+        
     def generate_heatmap(self, start_time, end_time, resolution=100):
         """
         Gera um mapa de calor baseado nas posições do cursor no intervalo de tempo especificado
-        com otimização de performance
+        com otimização de performance. O mapa (uint16, em escala relativa) é gerado em
+        resolução reduzida (1/_hm_scale) e o array retornado é reutilizado na próxima chamada.
+        Cada amostra tem peso decay_factor ** (frames decorridos entre ela e a última
+        amostra do intervalo), independente da densidade das detecções.
         """
-        # Criar mapa de calor em branco
-        heatmap = np.zeros((self.height, self.width), dtype=np.float32)
+        if self._heatmap is None:
+            self._allocate_heatmap_buffer()
+        heatmap = self._heatmap
+        
+        # Intervalo de posições por busca binária (as posições estão ordenadas por tempo)
+        n = self._n_positions
+        ts = self._ts[:n]
+        i0 = int(np.searchsorted(ts, start_time, side='left'))
+        i1 = int(np.searchsorted(ts, end_time, side='right'))
+        params = (resolution, self.blur_size)
+        
+        prev_range = self._hm_range
+        if (prev_range is not None and prev_range[0] == i0 and prev_range[1] <= i1 and
+                self._hm_decay == self.decay_factor):
+            # Mesmo início e fim igual ou posterior: o heatmap anterior ainda vale ou
+            # basta acumular as amostras novas (as posições só são adicionadas no fim)
+            if prev_range[1] == i1 and self._hm_params == params:
+                return heatmap
+            self._accumulate_counts(prev_range[1], i1)
+        else:
+            # Início diferente ou fim anterior (retrocesso): reconstruir do zero
+            self._hm_counts.fill(0)
+            self._accumulate_counts(i0, i1)
+        self._hm_range = (i0, i1)
+        self._hm_decay = self.decay_factor
+        self._hm_params = params
         
-        # Se não houver posições, retornar mapa vazio
-        if not self.cursor_positions:
+        # Escalar os pesos para ocupar a faixa de 16 bits, preservando a precisão
+        # do desfoque no acumulador uint16
+        counts = self._hm_counts.reshape(heatmap.shape)
+        peak = counts.max()
+        if peak <= 0:
+            heatmap.fill(0)
             return heatmap
+        np.multiply(counts, 65535.0 / peak, out=heatmap, casting='unsafe')
         
-        # Otimização: pré-filtrar posições no intervalo de tempo para evitar verificação em loop
-        positions_in_range = []
-        for t, x, y in self.cursor_positions:
-            if start_time <= t <= end_time:
-                # Converter coordenadas para inteiros
-                x, y = int(x), int(y)
-                # Verificar se está dentro dos limites
-                if 0 <= x < self.width and 0 <= y < self.height:
-                    positions_in_range.append((x, y))
-        
-        # Adicionar cada posição do cursor ao mapa de calor
-        for x, y in positions_in_range:
-            # Adicionar ponto de calor
-            cv2.circle(heatmap, (x, y), resolution//4, (1.0), -1)
-        
-        # Aplicar desfoque gaussiano para suavizar (se houver pontos)
-        if positions_in_range:
-            heatmap = cv2.GaussianBlur(heatmap, (self.blur_size, self.blur_size), 0)
+        # Dilatar cada célula pelo disco de raio resolution//4 (o máximo equivale à
+        # união dos círculos preenchidos) e suavizar com um desfoque gaussiano separável
+        disk, kernel = self._get_spread_kernels(resolution)
+        if disk is not None:
+            cv2.dilate(heatmap, disk, dst=heatmap, borderType=cv2.BORDER_CONSTANT, borderValue=0)
+        cv2.sepFilter2D(heatmap, -1, kernel, kernel, dst=heatmap, borderType=cv2.BORDER_REPLICATE)
         
         return heatmap
         
+    def _accumulate_counts(self, i_start, i_end):
+        """Decai os pesos acumulados e marca as células cobertas pelas amostras [i_start, i_end)"""
+        count = i_end - i_start
+        if count <= 0:
+            return
+            
+        counts = self._hm_counts
+        decay = self.decay_factor
+        ts = self._ts
+        if decay != 1.0:
+            # Decaimento por frame decorrido (e não por amostra): envelhecer o acumulado
+            # até a última amostra nova
+            weights = decay ** ((ts[i_end - 1] - ts[i_start:i_end]) * self.fps)
+            if i_start > 0:
+                counts *= decay ** ((ts[i_end - 1] - ts[i_start - 1]) * self.fps)
+            
+        # Descartar posições fora do frame e marcar a célula de cada amostra (um impulso
+        # por posição, sem desenhar círculos). Cada célula guarda o maior peso, e não a
+        # soma: os círculos do traçado original saturam em 1 onde se sobrepõem
+        scale = self._hm_scale
+        xs = self._xs[i_start:i_end]
+        ys = self._ys[i_start:i_end]
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        cols = self._heatmap.shape[1]
+        indices = (ys[inside] // scale) * cols + xs[inside] // scale
+        
+        if decay != 1.0:
+            np.maximum.at(counts, indices, weights[inside])
+        else:
+            counts[indices] = 1.0
+        
+    def _get_spread_kernels(self, resolution):
+        """
+        Retorna o elemento estruturante do disco (None se o raio for menor que uma célula)
+        e o kernel gaussiano 1D (float32) do desfoque, ambos na resolução reduzida
+        """
+        key = (self.blur_size, resolution)
+        if self._spread_kernel_key != key:
+            scale = self._hm_scale
+            radius = int(round((resolution // 4) / scale))
+            self._spread_disk = (cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * radius + 1,) * 2)
+                                 if radius > 0 else None)
+            sigma = self._spread_sigma() / scale
+            ksize = 2 * int(np.ceil(3 * sigma)) + 1
+            self._spread_kernel = cv2.getGaussianKernel(ksize, sigma, cv2.CV_32F)
+            self._spread_kernel_key = key
+        return self._spread_disk, self._spread_kernel
+        
+    def _spread_sigma(self):
+        """Sigma implícito do OpenCV para o desfoque gaussiano de tamanho blur_size"""
+        return 0.3 * ((self.blur_size - 1) * 0.5 - 1) + 0.8
+        
     def apply_heatmap_to_frame(self, frame, heatmap, alpha_max=0.7):
-        """Aplica o mapa de calor a um frame de vídeo"""
-        # Normalizar o heatmap
-        norm = Normalize(vmin=0, vmax=np.max(heatmap) if np.max(heatmap) > 0 else 1)
-        normalized_heatmap = norm(heatmap)
+        """Aplica o mapa de calor a um frame de vídeo (o resultado é reutilizado na próxima chamada)"""
+        if self._blend is None or self._blend.shape != frame.shape:
+            self._allocate_buffers(frame.shape[0], frame.shape[1])
+            
+        # Ampliar o heatmap (gerado em resolução reduzida) para o tamanho do frame
+        if heatmap.shape != frame.shape[:2]:
+            heatmap = cv2.resize(heatmap, (frame.shape[1], frame.shape[0]),
+                                 dst=self._heatmap_full, interpolation=cv2.INTER_LINEAR)
+            
+        # Normalizar o heatmap para 0-255 (vmin=0, vmax=máximo do heatmap)
+        max_value = float(heatmap.max())
+        scale = 255.0 / max_value if max_value > 0 else 0.0
+        cv2.convertScaleAbs(heatmap, dst=self._norm, alpha=scale)
         
-        # Aplicar mapa de cores
-        cmap = getattr(cm, self.colormap)
-        colored_heatmap = cmap(normalized_heatmap)
-        colored_heatmap = (colored_heatmap[:, :, :3] * 255).astype(np.uint8)
-        colored_heatmap_bgr = cv2.cvtColor(colored_heatmap, cv2.COLOR_RGB2BGR)
+        # Aplicar mapa de cores (LUT do OpenCV, já em BGR)
+        colored_heatmap_bgr = cv2.applyColorMap(
+            self._norm, self._colormap_id, dst=self._colored_bgr
+        )
         
-        # Criar máscara alpha
-        alpha = normalized_heatmap * alpha_max
+        # Criar máscara alpha quantizada em 8 bits (0-255 representa 0.0-1.0)
+        alpha = cv2.convertScaleAbs(heatmap, dst=self._alpha, alpha=scale * alpha_max)
         
-        # Aplicar heatmap sobre o frame
-        result = frame.copy()
-        for c in range(3):
-            result[:, :, c] = frame[:, :, c] * (1 - alpha) + colored_heatmap_bgr[:, :, c] * alpha
+        # Aplicar heatmap sobre o frame: (frame * (255 - a) + cor * a) / 255, em inteiros
+        if _blend_kernel is not None:
+            _blend_kernel(frame, colored_heatmap_bgr, alpha, self._blend)
+            return self._blend
             
-        return result.astype(np.uint8)
+        # Sem Numba: operações NumPy em buffers uint16
+        inv_alpha = np.subtract(255, alpha, out=self._alpha_inv)
+        tmp = self._blend_tmp
+        tmp2 = self._blend_tmp2
+        np.multiply(frame, inv_alpha[:, :, np.newaxis], out=tmp, dtype=np.uint16)
+        np.multiply(colored_heatmap_bgr, alpha[:, :, np.newaxis], out=tmp2, dtype=np.uint16)
+        np.add(tmp, tmp2, out=tmp)
+        np.add(tmp, 128, out=tmp)
+        # Divisão exata por 255 com deslocamentos
+        np.right_shift(tmp, 8, out=tmp2)
+        np.add(tmp, tmp2, out=tmp)
+        np.right_shift(tmp, 8, out=tmp)
+        np.copyto(self._blend, tmp, casting='unsafe')
+        
+        return self._blend
         
     def get_frame_at_time(self, time_pos):
-        """Obtém o frame do vídeo em um determinado momento"""
+        """Obtém o frame do vídeo em um determinado momento (o frame retornado não deve ser alterado)"""
         if self.cap is None or not self.cap.isOpened():
             return None
             
         # Converter tempo para número de frame
         frame_pos = int(time_pos * self.fps)
         
-        # Posicionar o vídeo nesse frame
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
+        # Frame decodificado recentemente: evita seek e decodificação
+        frame = self._frame_cache.get(frame_pos)
+        if frame is not None:
+            self._frame_cache.move_to_end(frame_pos)
+            self.current_frame_pos = frame_pos
+            return frame
+            
+        self._cap_moves += 1
+        
+        # Poucos frames à frente da posição de leitura: avançar com grab() é mais barato
+        # que reposicionar, pois o seek decodifica a partir do keyframe anterior
+        frames_ahead = frame_pos - int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if 0 <= frames_ahead <= 32:
+            for _ in range(frames_ahead):
+                if not self.cap.grab():
+                    break
+        else:
+            # Posicionar o vídeo nesse frame
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
         
         # Ler o frame
         ret, frame = self.cap.read()
         
-        # Restaurar a posição anterior
         self.current_frame_pos = frame_pos
         
         if not ret:
             return None
             
+        # Guardar no cache, descartando o frame usado há mais tempo
+        self._frame_cache[frame_pos] = frame
+        if len(self._frame_cache) > self.frame_cache_size:
+            self._frame_cache.popitem(last=False)
+            
         return frame
         
-    def set_colormap(self, colormap_name):
-        """Define o mapa de cores a ser usado"""
-        self.colormap = colormap_name
+    def set_colormap(self, colormap):
+        """Define o mapa de cores a ser usado (nome em COLORMAPS ou constante cv2.COLORMAP_*)"""
+        self.colormap = colormap
+        if isinstance(colormap, str):
+            self._colormap_id = COLORMAPS.get(colormap, cv2.COLORMAP_HOT)
+        else:
+            self._colormap_id = int(colormap)
         
     def set_blur_size(self, value):
         """Define o tamanho do desfoque (deve ser ímpar)"""
@@ -196,4 +747,14 @@ class VideoHeatmapProcessor:
     def release(self):
         """Libera os recursos de vídeo"""
         if self.cap is not None:
-            self.cap.release()
\ No newline at end of file
+            self.cap.release()
+        self._frame_cache.clear()
+        self._heatmap = None
+        self._heatmap_full = None
+        self._colored_bgr = None
+        self._norm = None
+        self._alpha = None
+        self._alpha_inv = None
+        self._blend = None
+        self._blend_tmp = None
+        self._blend_tmp2 = None
\ No newline at end of file
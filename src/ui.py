@@ -1,9 +1,10 @@
 import cv2
+import os
 import sys
 import json
+import collections
 import numpy as np
-import time
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QPushButton, QLabel, QSlider, QComboBox, 
                            QFileDialog, QGroupBox, QCheckBox, QSpinBox, QToolBar,
                            QProgressBar, QMessageBox, QDoubleSpinBox, QTabWidget,
@@ -11,15 +12,53 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                            QToolButton, QMenu, QStatusBar, QStyle, QStyleFactory,
                            QSizePolicy)
 from PyQt5.QtCore import (Qt, QTimer, pyqtSlot, QThread, pyqtSignal, QRect, QSize, 
-                        QPoint)
-from PyQt5.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QBrush, QIcon, QPalette, QFont
-from .processor import VideoHeatmapProcessor
+                        QPoint, QMutex, QMutexLocker, QWaitCondition, QElapsedTimer,
+                        QSignalBlocker)
+from PyQt5.QtGui import (QImage, QPixmap, QPainter, QPen, QColor, QBrush, QIcon, QPalette, QFont,
+                         QPixmapCache, QPainterPath, QPolygon)
+from .processor import VideoHeatmapProcessor, COLORMAPS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # orjson é opcional: sem ele, a exportação usa o módulo json
+
+# Formato BGR nativo do QImage (Qt 5.14+), que dispensa a conversão de cor na exibição
+_FORMAT_BGR888 = getattr(QImage, 'Format_BGR888', None)
+
+def _prescale(frame, box):
+    """Reduz o frame ao tamanho em que será exibido na caixa (largura, altura), mantendo a
+    proporção como Qt.KeepAspectRatio; frames menores que a caixa não são ampliados"""
+    h, w = frame.shape[:2]
+    box_w, box_h = box
+    tw = box_h * w // h
+    if tw <= box_w:
+        th = box_h
+    else:
+        tw, th = box_w, box_w * h // w
+    if tw >= w or th >= h or tw <= 0 or th <= 0:
+        return frame
+    return cv2.resize(frame, (tw, th), interpolation=cv2.INTER_AREA)
 
 class TimelineWidget(QWidget):
     """Widget customizado para timeline com marcadores de início e fim (estilo DaVinci Resolve)"""
     
     rangeChanged = pyqtSignal(float, float)  # Emitido quando o intervalo é alterado (start, end)
     positionChanged = pyqtSignal(float)      # Emitido quando a posição atual muda
+    positionChangedFast = pyqtSignal(float)  # Emitido durante o arraste do cursor de reprodução
+    positionChangedExact = pyqtSignal(float) # Emitido ao soltar o cursor de reprodução
+    
+    # Cores, canetas e pincéis criados uma única vez (não a cada pintura)
+    _BG_COLOR = QColor(42, 42, 42)
+    _TICK_PEN = QPen(QColor(70, 70, 70), 1)
+    _TEXT_COLOR = QColor(220, 220, 220)  # Texto CLARO
+    _BAR_BRUSH = QBrush(QColor(32, 217, 75, 200))  # Verde DaVinci com transparência
+    _SELECTION_BRUSH = QBrush(QColor(0, 90, 160, 80))  # Azul semitransparente
+    _TRACK_PEN = QPen(QColor(50, 120, 200), 2)
+    _START_BRUSH = QBrush(QColor(0, 140, 255))
+    _END_BRUSH = QBrush(QColor(255, 60, 60))
+    _PLAYHEAD_BRUSH = QBrush(QColor(220, 220, 220))
+    _PLAYHEAD_PEN = QPen(QColor(220, 220, 220), 1)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -27,6 +66,10 @@ class TimelineWidget(QWidget):
         self.start_marker = 0.0      # Posição inicial em segundos
         self.end_marker = 10.0       # Posição final em segundos
         self.current_pos = 0.0       # Posição atual em segundos
+        self.fps = 30.0              # Taxa de frames do vídeo (para o campo de frame)
+        
+        # Textos de tempo já formatados: (segundos inteiros, frame) -> texto
+        self._time_text_cache = {}
         
         self.dragging_start = False
         self.dragging_end = False
@@ -37,32 +80,71 @@ class TimelineWidget(QWidget):
         
         # Gerar dados falsos de heatmap para visualização
         self.heatmap_data = None
+        self._heatmap_version = 0  # Incrementado a cada novo conjunto de dados (chave do cache)
+        
+        # Polígono do cabeçote, reaproveitado entre pinturas
+        self._playhead_polygon = QPolygon([QPoint(0, 0), QPoint(0, 0), QPoint(0, 0)])
+        
+        # Escala pixels/segundo, recalculada só quando a largura ou a duração mudam
+        self._update_scale()
+        
+        # Repinturas agrupadas: no máximo uma a cada 16 ms (~60 Hz), mesmo com eventos
+        # de mouse ou de reprodução mais frequentes
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(16)
+        self._repaint_timer.timeout.connect(self.update)
+        
+    def _schedule_repaint(self):
+        """Agenda uma repintura, agrupando as solicitações feitas dentro do intervalo"""
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+        
+    def _update_scale(self):
+        """Recalcula a escala usada nas conversões entre tempo e pixels"""
+        usable = self.width() - 20
+        if self.total_duration > 0 and usable > 0:
+            self._scale = usable / self.total_duration
+            self._inv_scale = self.total_duration / usable
+        else:
+            self._scale = self._inv_scale = 0.0
+            
+    def resizeEvent(self, event):
+        """Atualiza a escala da timeline ao redimensionar"""
+        self._update_scale()
+        super().resizeEvent(event)
         
-    def setTotalDuration(self, duration):
-        """Define a duração total do vídeo"""
+    def setTotalDuration(self, duration, fps=None):
+        """Define a duração total do vídeo (e, opcionalmente, sua taxa de frames)"""
         self.total_duration = duration
+        self._update_scale()
+        if fps:
+            self.fps = fps
         if self.end_marker > duration:
             self.end_marker = duration
-        self.update()
+        self._schedule_repaint()
         
     def setRange(self, start, end):
         """Define o intervalo selecionado"""
-        self.start_marker = max(0, min(start, self.total_duration))
-        self.end_marker = min(max(end, self.start_marker), self.total_duration)
-        self.update()
+        duration = self.total_duration
+        self.start_marker = 0 if start < 0 else (duration if start > duration else start)
+        self.end_marker = self.start_marker if end < self.start_marker else (duration if end > duration else end)
+        self._schedule_repaint()
         
     def setCurrentPosition(self, pos):
         """Define a posição atual na timeline"""
         old_pos = self.current_pos
-        self.current_pos = max(0, min(pos, self.total_duration))
+        self.current_pos = 0 if pos < 0 else (self.total_duration if pos > self.total_duration else pos)
         if old_pos != self.current_pos:
             self.positionChanged.emit(self.current_pos)
-        self.update()
+        self._schedule_repaint()
         
     def setHeatmapData(self, data):
-        """Define os dados de heatmap para visualização na timeline"""
-        self.heatmap_data = data
-        self.update()
+        """Define os dados de heatmap (pares tempo, intensidade) para visualização na timeline"""
+        # Guardados como array (N, 2) para calcular as barras de forma vetorizada
+        self.heatmap_data = None if data is None else np.asarray(data, dtype=np.float64).reshape(-1, 2)
+        self._heatmap_version += 1
+        self._schedule_repaint()
         
     def getCurrentPosition(self):
         """Retorna a posição atual em segundos"""
@@ -74,11 +156,11 @@ class TimelineWidget(QWidget):
         
     def secondsToPixels(self, seconds):
         """Converte tempo em segundos para posição em pixels"""
-        return int((seconds / self.total_duration) * (self.width() - 20)) + 10
+        return int(seconds * self._scale) + 10
         
     def pixelsToSeconds(self, pixels):
         """Converte posição em pixels para tempo em segundos"""
-        return ((pixels - 10) / (self.width() - 20)) * self.total_duration
+        return (pixels - 10) * self._inv_scale
         
     def mousePressEvent(self, event):
         """Manipular clique do mouse"""
@@ -108,7 +190,10 @@ class TimelineWidget(QWidget):
         if any([self.dragging_start, self.dragging_end, self.dragging_current]):
             x = event.x()
             new_pos = self.pixelsToSeconds(x)
-            new_pos = min(max(0, new_pos), self.total_duration)
+            if new_pos < 0:
+                new_pos = 0
+            elif new_pos > self.total_duration:
+                new_pos = self.total_duration
             
             if self.dragging_start:
                 if new_pos < self.end_marker:
@@ -119,16 +204,97 @@ class TimelineWidget(QWidget):
                     self.end_marker = new_pos
                     self.rangeChanged.emit(self.start_marker, self.end_marker)
             elif self.dragging_current:
-                self.setCurrentPosition(new_pos)
+                # Durante o arraste apenas a pré-visualização rápida é solicitada
+                if new_pos != self.current_pos:
+                    self.current_pos = new_pos
+                    self.positionChangedFast.emit(new_pos)
                 
-            self.update()
+            self._schedule_repaint()
             
     def mouseReleaseEvent(self, event):
         """Manipular liberação do clique do mouse"""
+        if self.dragging_current:
+            self.positionChangedExact.emit(self.current_pos)
         self.dragging_start = False
         self.dragging_end = False
         self.dragging_current = False
         
+    def _time_text(self, seconds, frame=0):
+        """Formata um tempo como mm:ss:ff, reaproveitando textos já formatados"""
+        key = (int(seconds), frame)
+        text = self._time_text_cache.get(key)
+        if text is None:
+            if len(self._time_text_cache) >= 4096:
+                self._time_text_cache.clear()
+            mins, secs = divmod(key[0], 60)
+            text = f"{mins:02d}:{secs:02d}:{frame:02d}"
+            self._time_text_cache[key] = text
+        return text
+        
+    def _background_pixmap(self, width, height):
+        """
+        Retorna o fundo com as marcações de tempo e as barras de intensidade, renderizado uma
+        vez por tamanho, escala da tela, duração e conjunto de dados de heatmap
+        """
+        # Em resolução de dispositivo, para não ampliar (e borrar) o fundo em telas HiDPI
+        dpr = self.devicePixelRatioF()
+        key = f"tl-bg-{width}x{height}@{dpr}-{self.total_duration}"
+        if self.heatmap_data is not None:
+            key += f"-{id(self)}-{self._heatmap_version}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None:
+            return pixmap
+            
+        pixmap = QPixmap(int(width * dpr), int(height * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(self.font())
+        
+        # Desenhar fundo
+        painter.fillRect(0, 0, width, height, self._BG_COLOR)
+        
+        # Desenhar marcações de tempo (10% do tempo total cada): a marcação inicial em
+        # cinza escuro e as demais, em um único caminho, na cor clara do texto
+        painter.setPen(self._TICK_PEN)
+        painter.drawLine(10, 5, 10, height - 5)
+        tick_path = QPainterPath()
+        for i in range(1, 11):  # 10% a 100%
+            x = int(10 + (i * (width - 20) / 10))
+            tick_path.moveTo(x, 5)
+            tick_path.lineTo(x, height - 5)
+        painter.setPen(self._TEXT_COLOR)
+        painter.drawPath(tick_path)
+        
+        # Adicionar texto de tempo nas marcações pares (evita sobreposição)
+        painter.setPen(self._TEXT_COLOR)
+        for i in range(0, 11, 2):
+            x = 10 + (i * (width - 20) / 10)
+            time_seconds = (i / 10) * self.total_duration
+            mins, secs = divmod(int(time_seconds), 60)
+            time_text = f"{mins:02d}:{secs:02d}"
+            painter.drawText(int(x - 15), height - 8, 30, 15, Qt.AlignCenter, time_text)
+            
+        # Desenhar "heatmap" na timeline (representação visual da intensidade)
+        if self.heatmap_data is not None:
+            # Posições e alturas de todas as barras calculadas de uma vez
+            duration = self.total_duration
+            times = self.heatmap_data[:, 0]
+            visible = times <= duration
+            xs = ((times[visible] / duration) * (width - 20)).astype(np.int64) + 10
+            bar_heights = (self.heatmap_data[visible, 1] * (height * 0.4)).astype(np.int64)
+            y_starts = (height // 2) - (bar_heights // 2)
+            
+            # Usar cor verde para visualizar intensidade (estilo forma de onda DaVinci)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self._BAR_BRUSH)
+            for x, y_start, bar_height in zip(xs.tolist(), y_starts.tolist(), bar_heights.tolist()):
+                painter.drawRect(x - 1, y_start, 2, bar_height)
+                
+        painter.end()
+        QPixmapCache.insert(key, pixmap)
+        return pixmap
+        
     def paintEvent(self, event):
         """Desenhar a timeline com estilo DaVinci Resolve"""
         painter = QPainter(self)
@@ -137,96 +303,61 @@ class TimelineWidget(QWidget):
         width = self.width()
         height = self.height()
         
-        # Desenhar fundo
-        painter.fillRect(0, 0, width, height, QColor(42, 42, 42))
+        # Conversão tempo -> pixels calculada uma vez por pintura (como em secondsToPixels)
+        scale = self._scale
+        start_x = int(self.start_marker * scale) + 10
+        end_x = int(self.end_marker * scale) + 10
+        current_x = int(self.current_pos * scale) + 10
         
-        # Desenhar marcações de tempo (10% do tempo total cada)
-        painter.setPen(QPen(QColor(70, 70, 70), 1))
-        for i in range(11):  # 0% a 100%
-            x = 10 + (i * (width - 20) / 10)
-            painter.drawLine(int(x), 5, int(x), height - 5)
-            
-            # Adicionar texto de tempo nas marcações
-            if i % 2 == 0:  # Mostrar apenas marcações pares para evitar sobreposição
-                time_seconds = (i / 10) * self.total_duration
-                mins, secs = divmod(int(time_seconds), 60)
-                time_text = f"{mins:02d}:{secs:02d}"
-                painter.setPen(QColor(220, 220, 220))  # Texto CLARO
-                painter.drawText(int(x - 15), height - 8, 30, 15, Qt.AlignCenter, time_text)
+        # Fundo, marcações de tempo e barras de intensidade (camada estática, desenhada a
+        # partir do cache)
+        painter.drawPixmap(0, 0, self._background_pixmap(width, height))
                 
-        # Desenhar "heatmap" na timeline (representação visual da intensidade)
-        if self.heatmap_data is not None:
-            # Simulação de dados de heatmap
-            for i in range(len(self.heatmap_data)):
-                time_point, intensity = self.heatmap_data[i]
-                if time_point <= self.total_duration:
-                    x = self.secondsToPixels(time_point)
-                    # Usar cor verde para visualizar intensidade (estilo forma de onda DaVinci)
-                    painter.setPen(Qt.NoPen)
-                    color = QColor(32, 217, 75, 200)  # Verde DaVinci com transparência
-                    painter.setBrush(QBrush(color))
-                    bar_height = int(intensity * (height * 0.4))
-                    y_start = (height // 2) - (bar_height // 2)
-                    painter.drawRect(x-1, y_start, 2, bar_height)
-        
         # Desenhar área selecionada (entre marcadores início/fim)
-        start_x = self.secondsToPixels(self.start_marker)
-        end_x = self.secondsToPixels(self.end_marker)
-        
         # Fundo da área selecionada
         painter.setPen(Qt.NoPen)
-        selection_brush = QBrush(QColor(0, 90, 160, 80))  # Azul semitransparente
-        painter.setBrush(selection_brush)
+        painter.setBrush(self._SELECTION_BRUSH)
         painter.drawRect(start_x, 5, end_x - start_x, height - 10)
         
         # Linha de tempo principal (estilo DaVinci)
-        painter.setPen(QPen(QColor(50, 120, 200), 2))
+        painter.setPen(self._TRACK_PEN)
         painter.drawLine(10, height // 2, width - 10, height // 2)
         
         # Marcadores
         # Início (azul)
         painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(QColor(0, 140, 255)))
+        painter.setBrush(self._START_BRUSH)
         painter.drawRect(start_x - 4, 5, 8, height - 10)
         
         # Fim (vermelho)
-        painter.setBrush(QBrush(QColor(255, 60, 60)))
+        painter.setBrush(self._END_BRUSH)
         painter.drawRect(end_x - 4, 5, 8, height - 10)
         
         # Posição atual (verde/branco)
-        painter.setBrush(QBrush(QColor(220, 220, 220)))
-        current_x = self.secondsToPixels(self.current_pos)
-        
         # Linha vertical na posição atual
-        painter.setPen(QPen(QColor(220, 220, 220), 1))
+        painter.setPen(self._PLAYHEAD_PEN)
         painter.drawLine(current_x, 0, current_x, height)
         
-        # Marcador triangular na posição atual (estilo cabeçote DaVinci)
-        points = [
-            QPoint(current_x, 0),
-            QPoint(current_x - 8, 8),
-            QPoint(current_x + 8, 8)
-        ]
+        # Marcador triangular na posição atual (estilo cabeçote DaVinci): só as
+        # coordenadas x do polígono reutilizado mudam
+        playhead = self._playhead_polygon
+        playhead.setPoint(0, current_x, 0)
+        playhead.setPoint(1, current_x - 8, 8)
+        playhead.setPoint(2, current_x + 8, 8)
         painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(QColor(220, 220, 220)))
-        painter.drawPolygon(points)
+        painter.setBrush(self._PLAYHEAD_BRUSH)
+        painter.drawPolygon(playhead)
         
         # Desenhar tempos nos marcadores início/fim
-        painter.setPen(QColor(220, 220, 220))  # Texto CLARO
+        painter.setPen(self._TEXT_COLOR)
         font = painter.font()
         font.setPointSize(8)
         painter.setFont(font)
         
-        # Formato min:seg
-        start_min, start_sec = divmod(int(self.start_marker), 60)
-        end_min, end_sec = divmod(int(self.end_marker), 60)
-        cur_min, cur_sec = divmod(int(self.current_pos), 60)
-        cur_frame = int((self.current_pos % 1) * 30)  # Assumindo 30fps
-        
-        # Textos de tempo estilo DaVinci (00:00:00:00)
-        start_text = f"{start_min:02d}:{start_sec:02d}:00"
-        end_text = f"{end_min:02d}:{end_sec:02d}:00"
-        current_text = f"{cur_min:02d}:{cur_sec:02d}:{cur_frame:02d}"
+        # Textos de tempo estilo DaVinci (min:seg:frame)
+        start_text = self._time_text(self.start_marker)
+        end_text = self._time_text(self.end_marker)
+        current_text = self._time_text(self.current_pos, int((self.current_pos % 1) * self.fps))
         
         # Posicionar textos
         painter.drawText(start_x - 30, height - 8, 60, 15, Qt.AlignCenter, start_text)
@@ -236,15 +367,22 @@ class TimelineWidget(QWidget):
 class WaveformWidget(QWidget):
     """Widget para visualização de forma de onda de atividade do cursor"""
     
+    # Cores, canetas e pincéis criados uma única vez (não a cada pintura)
+    _BG_COLOR = QColor(30, 30, 30)
+    _MID_PEN = QPen(QColor(80, 80, 80), 1)
+    _WAVE_BRUSH = QBrush(QColor(32, 217, 75, 150))  # Verde DaVinci com transparência
+    
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.cursor_positions = []
+        self.cursor_positions = np.empty((0, 3), dtype=np.float64)
+        self._times = np.empty(0, dtype=np.float64)  # Timestamps das posições, para o histograma
         self.width_seconds = 100.0  # Largura em segundos
         self.setMinimumHeight(80)
         
     def setCursorPositions(self, positions):
-        """Define as posições do cursor para visualização"""
-        self.cursor_positions = positions
+        """Define as posições do cursor (sequência ou array (N, 3) de tempo, x, y) para visualização"""
+        self.cursor_positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self._times = self.cursor_positions[:, 0]
         self.update()
         
     def setWidthSeconds(self, seconds):
@@ -254,7 +392,7 @@ class WaveformWidget(QWidget):
         
     def paintEvent(self, event):
         """Desenhar forma de onda estilo DaVinci"""
-        if not self.cursor_positions:
+        if not len(self.cursor_positions):
             return
             
         painter = QPainter(self)
@@ -264,46 +402,37 @@ class WaveformWidget(QWidget):
         height = self.height()
         
         # Fundo
-        painter.fillRect(0, 0, width, height, QColor(30, 30, 30))
+        painter.fillRect(0, 0, width, height, self._BG_COLOR)
         
         # Linha central
-        painter.setPen(QPen(QColor(80, 80, 80), 1))
+        painter.setPen(self._MID_PEN)
         painter.drawLine(0, height // 2, width, height // 2)
         
-        # Calcular histograma de atividade
+        # Calcular histograma de atividade (vetorizado com bincount)
         max_time = self.width_seconds
         bins = width // 2  # Número de bins para o histograma
+        if bins <= 0:
+            return
         bin_size = max_time / bins
-        histogram = [0] * bins
-        
-        for time, _, _ in self.cursor_positions:
-            if time <= max_time:
-                bin_idx = min(int(time / bin_size), bins - 1)
-                histogram[bin_idx] += 1
+        times = self._times[self._times <= max_time]
+        bin_idx = np.minimum((times / bin_size).astype(np.int64), bins - 1)
+        histogram = np.bincount(bin_idx, minlength=bins)
         
-        # Normalizar histograma
-        max_value = max(histogram) if histogram else 1
-        normalized = [h / max_value for h in histogram]
+        # Normalizar histograma e converter para deslocamentos verticais em pixels
+        max_value = max(int(histogram.max()), 1)
+        offsets = (histogram / max_value * (height // 2 - 5)).astype(np.int64).tolist()
         
-        # Desenhar forma de onda (estilo DaVinci)
-        points_top = []
-        points_bottom = []
-        
-        for i, value in enumerate(normalized):
-            x = i * 2  # Espaçamento de 2 pixels por bin
-            y_center = height // 2
-            y_offset = int(value * (height // 2 - 5))
-            
-            points_top.append(QPoint(x, y_center - y_offset))
-            points_bottom.append(QPoint(x, y_center + y_offset))
+        # Desenhar forma de onda (estilo DaVinci), com espaçamento de 2 pixels por bin
+        y_center = height // 2
+        points_top = [QPoint(i * 2, y_center - dy) for i, dy in enumerate(offsets)]
+        points_bottom = [QPoint(i * 2, y_center + dy) for i, dy in enumerate(offsets)]
         
         # Completar o polígono
-        points = points_top + list(reversed(points_bottom))
+        points = points_top + points_bottom[::-1]
         
         # Desenhar forma de onda preenchida
         painter.setPen(Qt.NoPen)
-        gradient = QColor(32, 217, 75, 150)  # Verde DaVinci com transparência
-        painter.setBrush(QBrush(gradient))
+        painter.setBrush(self._WAVE_BRUSH)
         
         if points:
             painter.drawPolygon(points)
@@ -313,57 +442,110 @@ class CursorDetectionThread(QThread):
     progress_updated = pyqtSignal(int)
     finished_processing = pyqtSignal(bool)
     
-    def __init__(self, processor, min_area=3, max_area=500, threshold=15):
+    def __init__(self, processor, min_area=3, max_area=500, threshold=15, stride=1):
         super().__init__()
         self.processor = processor
         self.min_area = min_area
         self.max_area = max_area
         self.threshold = threshold
+        self.stride = stride  # Analisar um a cada stride frames
         
     def run(self):
-        # Processar todo o vídeo para detectar cursores
-        total_frames = self.processor.total_frames
-        self.processor.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        # Processar todo o vídeo para detectar cursores (o laço por frame roda no processador)
+        self.processor.detect_cursor_positions(
+            threshold=self.threshold,
+            min_area=self.min_area, 
+            max_area=self.max_area,
+            stride=self.stride,
+            progress=self.progress_updated.emit,
+            should_stop=self.isInterruptionRequested
+        )
         
-        frame_count = 0
-        self.processor.cursor_positions = []
-        prev_frame = None
+        # Interrompida no encerramento da aplicação: não há a quem notificar
+        if not self.isInterruptionRequested():
+            self.finished_processing.emit(True)
+
+class CompositeWorker(QThread):
+    """Thread que decodifica e compõe os frames da reprodução (a última posição solicitada vence)"""
+    frameReady = pyqtSignal(QImage, object, float)  # Imagem, frame BGR composto, posição
+    renderDone = pyqtSignal()  # Emitido ao concluir cada pedido (mesmo sem frame)
+    
+    def __init__(self, processor):
+        super().__init__()
+        self.processor = processor
+        self._mutex = QMutex()
+        self._wake = QWaitCondition()
+        self._request = None  # (posição, heatmap ou None), sobrescrito a cada pedido
+        self._stopping = False
+        # Buffers livres para os frames entregues. Um frame emitido pertence à interface
+        # até ser devolvido com release(), então nunca é reescrito enquanto está na fila de
+        # eventos ou em exibição (pedidos de cliques e buscas não esperam o renderDone)
+        self._free_slots = []
+        self._rgb = None
+        
+    def request(self, pos, heatmap, box):
+        """Solicita o frame da posição (reduzido à caixa de exibição), descartando um pedido
+        anterior ainda não atendido"""
+        with QMutexLocker(self._mutex):
+            self._request = (pos, heatmap, box)
+            self._wake.wakeOne()
+            
+    def release(self, frame):
+        """Devolve um frame entregue por frameReady para ser reutilizado"""
+        with QMutexLocker(self._mutex):
+            self._free_slots.append(frame)
+            
+    def _acquire_slot(self, like):
+        """Retorna um buffer livre com o formato do frame (alocando um novo se preciso)"""
+        with QMutexLocker(self._mutex):
+            while self._free_slots:
+                slot = self._free_slots.pop()
+                if slot.shape == like.shape:
+                    return slot
+        return np.empty_like(like)
+        
+    def stop(self):
+        """Encerra a thread e aguarda o término"""
+        with QMutexLocker(self._mutex):
+            self._stopping = True
+            self._wake.wakeOne()
+        self.wait()
         
+    def run(self):
         while True:
-            ret, frame = self.processor.cap.read()
-            if not ret:
-                break
+            with QMutexLocker(self._mutex):
+                while self._request is None and not self._stopping:
+                    self._wake.wait(self._mutex)
+                if self._stopping:
+                    return
+                pos, heatmap, box = self._request
+                self._request = None
                 
-            # Timestamp do frame em segundos
-            timestamp = frame_count / self.processor.fps
-            
-            # Detectar posição do cursor usando diferença entre frames
-            x, y = -1, -1
-            
-            if prev_frame is not None:
-                x, y = self.processor.detect_cursor_from_difference(
-                    frame, prev_frame,
-                    threshold=self.threshold,
-                    min_area=self.min_area, 
-                    max_area=self.max_area
-                )
-            
-            # Armazenar posição se o cursor for detectado
-            if x >= 0 and y >= 0:
-                self.processor.cursor_positions.append((timestamp, x, y))
+            with self.processor.lock:
+                frame = self.processor.get_frame_at_time(pos)
+                if frame is None:
+                    self.renderDone.emit()
+                    continue
+                # Compor já no tamanho de exibição
+                frame = _prescale(frame, box)
+                if heatmap is not None:
+                    frame = self.processor.apply_heatmap_to_frame(frame, heatmap)
+                # Copiar para um buffer livre: os buffers do processador são reutilizados
+                slot = self._acquire_slot(frame)
+                np.copyto(slot, frame)
+                frame = slot
                 
-            # Armazenar frame para próxima comparação
-            prev_frame = frame.copy()
-            
-            frame_count += 1
-            
-            # Emitir progresso
-            progress = int((frame_count / total_frames) * 100)
-            self.progress_updated.emit(progress)
-            
-        # Resetar o vídeo para o início
-        self.processor.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-        self.finished_processing.emit(True)
+            h, w, c = frame.shape
+            if _FORMAT_BGR888 is not None:
+                # A imagem referencia o buffer, que é emitido junto e mantido vivo pelo receptor
+                image = QImage(frame.data, w, h, w * c, _FORMAT_BGR888)
+            else:
+                if self._rgb is None or self._rgb.shape != frame.shape:
+                    self._rgb = np.empty_like(frame)
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+                image = QImage(rgb.data, w, h, w * c, QImage.Format_RGB888).copy()
+            self.frameReady.emit(image, frame, pos)
+            self.renderDone.emit()
 
 class VideoHeatmapApp(QMainWindow):
     """Interface gráfica para o aplicativo de heatmap de vídeo (estilo DaVinci Resolve)"""
@@ -377,11 +559,62 @@ class VideoHeatmapApp(QMainWindow):
         # self.timer = QTimer()
         # self.timer.timeout.connect(self.update_frame)
         
+        # Buffer RGB reutilizado na exibição dos frames
+        self._rgb_buf = None
+        # Cópia própria do último frame exibido (reutilizada enquanto o tamanho não muda)
+        self._display_buf = None
+        
         # Para a linha do tempo
         self.current_time = 0
         self.start_time_window = 0
         self.end_time_window = 10  # 10 segundos iniciais
         
+        # Seek agrupado durante o arraste da timeline: no máximo um a cada 50 ms, sempre
+        # para a posição mais recente
+        self._pending_seek_pos = None
+        self._pending_seek_exact = True
+        self._seek_timer = QTimer(self)
+        self._seek_timer.setSingleShot(True)
+        self._seek_timer.setInterval(50)
+        self._seek_timer.timeout.connect(self._do_seek)
+        
+        # Mudanças de configuração do heatmap agrupadas: um único redesenho 80 ms após a
+        # última alteração
+        self._settings_timer = QTimer(self)
+        self._settings_timer.setSingleShot(True)
+        self._settings_timer.setInterval(80)
+        self._settings_timer.timeout.connect(self.update_heatmap_view)
+        
+        # Redimensionamentos agrupados: o frame é reexibido 50 ms após o último
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(50)
+        self._resize_timer.timeout.connect(self.update_after_resize)
+        
+        # Cache LRU dos heatmaps gerados (chave: janela e parâmetros de geração)
+        self._heatmap_cache = collections.OrderedDict()
+        # Verdadeiro quando o frame exibido não reflete a posição e o heatmap atuais
+        self._heatmap_dirty = True
+        
+        # Frames da reprodução já compostos e escalados ficam no QPixmapCache (chave: vídeo,
+        # frame, heatmap e área de exibição), para que trechos revistos não sejam recompostos
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), 100 * 1024))
+        self._video_serial = 0
+        self._requested_pixmap_key = None  # (posição, chave) do último pedido à composição
+        
+        # Composição dos frames da reprodução fora da thread da interface
+        self._compositor = CompositeWorker(self.processor)
+        self._compositor.frameReady.connect(self._show_composited_frame)
+        self._compositor.renderDone.connect(self._schedule_advance)
+        self._compositor.start()
+        
+        # Reprodução: cada avanço é agendado só depois que o frame anterior foi exibido
+        self._playing = False
+        self.play_timer = QTimer(self)
+        self.play_timer.setSingleShot(True)
+        self.play_timer.timeout.connect(self.advance_timeline)
+        self._tick_clock = QElapsedTimer()  # Tempo desde o início do avanço atual
+        
         # Aplicar estilo visual escuro
         self.apply_dark_style()
         
@@ -493,7 +726,7 @@ class VideoHeatmapApp(QMainWindow):
             }
             QStatusBar {
                 background-color: #323232;
-                color: #BBBBBB;
+                color: #DDDDDD;
             }
             QToolBar {
                 background-color: #282828;
@@ -512,6 +745,17 @@ class VideoHeatmapApp(QMainWindow):
             QLabel {
                 color: #DDDDDD;  /* Texto mais claro para todos os QLabel */
             }
+            QLabel#panelHeader {
+                font-weight: bold;
+            }
+            QLabel#timeDisplay {
+                font-family: monospace;
+                font-size: 14px;
+            }
+            QLabel#videoView {
+                background-color: #111111;
+                border: 1px solid #555555;
+            }
             QHeaderView::section {
                 background-color: #353535;
                 color: #DDDDDD;  /* Texto mais claro */
@@ -617,14 +861,13 @@ class VideoHeatmapApp(QMainWindow):
         
         # Título do painel
         files_header = QLabel("Arquivos de Mídia")
-        files_header.setStyleSheet("font-weight: bold; color: #DDDDDD;")  # Texto claro
+        files_header.setObjectName("panelHeader")
         files_layout.addWidget(files_header)
         
         # TreeWidget para arquivos (simplificado)
         self.files_tree = QTreeWidget()
         self.files_tree.setHeaderLabel("Nome")
         self.files_tree.setColumnCount(1)
-        self.files_tree.setStyleSheet("color: #DDDDDD;")  # Texto claro
         
         # Adicionar apenas categorias principais
         videos_item = QTreeWidgetItem(["VÍDEOS"])
@@ -633,10 +876,15 @@ class VideoHeatmapApp(QMainWindow):
         processed_item = QTreeWidgetItem(["PROCESSADOS"])
         processed_item.setForeground(0, QColor(220, 220, 220))
         
-        self.files_tree.addTopLevelItem(videos_item)
-        self.files_tree.addTopLevelItem(processed_item)
+        # Todas as linhas têm a mesma altura: permite ao Qt não medir cada item
+        self.files_tree.setUniformRowHeights(True)
+        self.files_tree.addTopLevelItems([videos_item, processed_item])
         self.files_tree.expandAll()
         
+        # Categorias guardadas para inserir itens sem procurá-las na árvore
+        self._videos_node = videos_item
+        self._processed_node = processed_item
+        
         files_layout.addWidget(self.files_tree)
         
         # ==============================================
@@ -651,13 +899,12 @@ class VideoHeatmapApp(QMainWindow):
         self.video_view.setAlignment(Qt.AlignCenter)
         self.video_view.setMinimumSize(640, 360)
         self.video_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # Permitir expansão
-        self.video_view.setStyleSheet("background-color: #111111; border: 1px solid #555555;")
+        self.video_view.setObjectName("videoView")
         viewer_layout.addWidget(self.video_view)
         
         # Nome do arquivo atual
         self.current_file_label = QLabel("Nenhum arquivo aberto")
         self.current_file_label.setAlignment(Qt.AlignCenter)
-        self.current_file_label.setStyleSheet("color: #DDDDDD;")  # Texto claro
         viewer_layout.addWidget(self.current_file_label)
         
         # Configurar política de dimensionamento para permitir ajuste automático
@@ -672,24 +919,21 @@ class VideoHeatmapApp(QMainWindow):
         
         # Título do painel
         props_header = QLabel("Propriedades")
-        props_header.setStyleSheet("font-weight: bold; color: #DDDDDD;")  # Texto claro
+        props_header.setObjectName("panelHeader")
         props_layout.addWidget(props_header)
         
         # Configurações de detecção em um GroupBox
         detection_group = QGroupBox("Detecção de Cursor")
-        detection_group.setStyleSheet("color: #DDDDDD;")  # Texto claro
         detection_layout = QVBoxLayout(detection_group)
         
         # Sensibilidade
         sensitivity_layout = QHBoxLayout()
         sensitivity_label = QLabel("Sensibilidade:")
-        sensitivity_label.setStyleSheet("color: #DDDDDD;")  # Texto claro
         sensitivity_layout.addWidget(sensitivity_label)
         self.threshold_slider = QSlider(Qt.Horizontal)
         self.threshold_slider.setRange(5, 30)  # Valores menores para melhor sensibilidade
         self.threshold_slider.setValue(15)
         self.threshold_value = QLabel("15")
-        self.threshold_value.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.threshold_slider.valueChanged.connect(lambda v: self.threshold_value.setText(str(v)))
         sensitivity_layout.addWidget(self.threshold_slider)
         sensitivity_layout.addWidget(self.threshold_value)
@@ -698,48 +942,51 @@ class VideoHeatmapApp(QMainWindow):
         # Tamanho mínimo/máximo
         size_layout = QHBoxLayout()
         size_label = QLabel("Min/Max:")
-        size_label.setStyleSheet("color: #DDDDDD;")  # Texto claro
         size_layout.addWidget(size_label)
         self.min_size_spin = QSpinBox()
         self.min_size_spin.setRange(1, 50)
         self.min_size_spin.setValue(3)  # Valor menor para detectar cursores menores
-        self.min_size_spin.setStyleSheet("color: #DDDDDD;")  # Texto claro
         size_layout.addWidget(self.min_size_spin)
         self.max_size_spin = QSpinBox()
         self.max_size_spin.setRange(10, 1000)
         self.max_size_spin.setValue(500)
-        self.max_size_spin.setStyleSheet("color: #DDDDDD;")  # Texto claro
         size_layout.addWidget(self.max_size_spin)
         detection_layout.addLayout(size_layout)
         
+        # Intervalo entre frames analisados (maior = mais rápido, menos preciso)
+        stride_layout = QHBoxLayout()
+        stride_label = QLabel("Intervalo (frames):")
+        stride_layout.addWidget(stride_label)
+        self.stride_spin = QSpinBox()
+        self.stride_spin.setRange(1, 10)
+        self.stride_spin.setValue(1)
+        stride_layout.addWidget(self.stride_spin)
+        detection_layout.addLayout(stride_layout)
+        
         # Botão de processamento e progresso
         self.process_button = QPushButton("Processar Vídeo")
-        self.process_button.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.process_button.clicked.connect(self.process_video)
         detection_layout.addWidget(self.process_button)
         
         self.progress_bar = QProgressBar()
-        self.progress_bar.setStyleSheet("color: #DDDDDD;")  # Texto claro
         detection_layout.addWidget(self.progress_bar)
         
         props_layout.addWidget(detection_group)
         
         # Configurações de visualização do heatmap
         heatmap_group = QGroupBox("Configurações de Heatmap")
-        heatmap_group.setStyleSheet("color: #DDDDDD;")  # Texto claro
         heatmap_layout = QVBoxLayout(heatmap_group)
         
         # Resolução
         resolution_layout = QHBoxLayout()
         resolution_label = QLabel("Resolução:")
-        resolution_label.setStyleSheet("color: #DDDDDD;")  # Texto claro
         resolution_layout.addWidget(resolution_label)
         self.resolution_slider = QSlider(Qt.Horizontal)
         self.resolution_slider.setRange(10, 200)
         self.resolution_slider.setValue(100)
         self.resolution_slider.valueChanged.connect(self.update_resolution)
+        self.resolution_slider.sliderReleased.connect(self._flush_settings)
         self.resolution_value = QLabel("100")
-        self.resolution_value.setStyleSheet("color: #DDDDDD;")  # Texto claro
         resolution_layout.addWidget(self.resolution_slider)
         resolution_layout.addWidget(self.resolution_value)
         heatmap_layout.addLayout(resolution_layout)
@@ -747,15 +994,14 @@ class VideoHeatmapApp(QMainWindow):
         # Blur
         blur_layout = QHBoxLayout()
         blur_label = QLabel("Suavização:")
-        blur_label.setStyleSheet("color: #DDDDDD;")  # Texto claro
         blur_layout.addWidget(blur_label)
         self.blur_slider = QSlider(Qt.Horizontal)
         self.blur_slider.setRange(3, 31)
         self.blur_slider.setValue(15)
         self.blur_slider.setSingleStep(2)
         self.blur_slider.valueChanged.connect(self.update_blur)
+        self.blur_slider.sliderReleased.connect(self._flush_settings)
         self.blur_value = QLabel("15")
-        self.blur_value.setStyleSheet("color: #DDDDDD;")  # Texto claro
         blur_layout.addWidget(self.blur_slider)
         blur_layout.addWidget(self.blur_value)
         heatmap_layout.addLayout(blur_layout)
@@ -763,18 +1009,15 @@ class VideoHeatmapApp(QMainWindow):
         # Color Map
         colormap_layout = QHBoxLayout()
         colormap_label = QLabel("Esquema:")
-        colormap_label.setStyleSheet("color: #DDDDDD;")  # Texto claro
         colormap_layout.addWidget(colormap_label)
         self.colormap_combo = QComboBox()
         self.colormap_combo.addItems(["hot", "jet", "inferno", "plasma", "viridis"])
-        self.colormap_combo.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.colormap_combo.currentIndexChanged.connect(self.update_colormap)
         colormap_layout.addWidget(self.colormap_combo)
         heatmap_layout.addLayout(colormap_layout)
         
         # Botão para atualizar visualização
         self.update_view_button = QPushButton("Atualizar Visualização")
-        self.update_view_button.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.update_view_button.clicked.connect(self.update_heatmap_view)
         heatmap_layout.addWidget(self.update_view_button)
         
@@ -782,16 +1025,13 @@ class VideoHeatmapApp(QMainWindow):
         
         # Botões de exportação
         export_group = QGroupBox("Exportação")
-        export_group.setStyleSheet("color: #DDDDDD;")  # Texto claro
         export_layout = QVBoxLayout(export_group)
         
         self.screenshot_button = QPushButton("📷 Capturar Imagem")
-        self.screenshot_button.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.screenshot_button.clicked.connect(self.take_screenshot)
         export_layout.addWidget(self.screenshot_button)
         
         self.export_button = QPushButton("💾 Exportar Dados")
-        self.export_button.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.export_button.clicked.connect(self.export_data)
         export_layout.addWidget(self.export_button)
         
@@ -820,20 +1060,18 @@ class VideoHeatmapApp(QMainWindow):
         
         self.play_button = QPushButton("▶")
         self.play_button.setFixedSize(32, 32)
-        self.play_button.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.play_button.clicked.connect(self.toggle_play)
         transport_toolbar.addWidget(self.play_button)
         
         self.stop_button = QPushButton("■")
         self.stop_button.setFixedSize(32, 32)
-        self.stop_button.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.stop_button.clicked.connect(self.stop_playback)
         transport_toolbar.addWidget(self.stop_button)
         
         transport_toolbar.addSpacing(20)
         
         self.time_display = QLabel("00:00:00.00")
-        self.time_display.setStyleSheet("font-family: monospace; font-size: 14px; color: #DDDDDD;")  # Texto claro
+        self.time_display.setObjectName("timeDisplay")
         self.time_display.setFixedWidth(120)
         transport_toolbar.addWidget(self.time_display)
         
@@ -849,6 +1087,8 @@ class VideoHeatmapApp(QMainWindow):
         self.timeline_widget = TimelineWidget()
         self.timeline_widget.rangeChanged.connect(self.timeline_range_changed)
         self.timeline_widget.positionChanged.connect(self.update_current_position)
+        self.timeline_widget.positionChangedFast.connect(self._preview_position)
+        self.timeline_widget.positionChangedExact.connect(self.update_current_position)
         bottom_layout.addWidget(self.timeline_widget)
         
         # Adicionar splitter vertical (divide parte superior/inferior)
@@ -864,9 +1104,7 @@ class VideoHeatmapApp(QMainWindow):
         
         # Barra de status
         status_bar = QStatusBar()
-        status_bar.setStyleSheet("color: #DDDDDD;")  # Texto claro
         self.status_label = QLabel("Pronto")
-        self.status_label.setStyleSheet("color: #DDDDDD;")  # Texto claro
         status_bar.addWidget(self.status_label)
         self.setStatusBar(status_bar)
         
@@ -907,16 +1145,21 @@ class VideoHeatmapApp(QMainWindow):
         
         if file_path:
             # Extrair apenas o nome do arquivo
-            file_name = file_path.split("/")[-1]
+            file_name = os.path.basename(file_path)
             self.current_file_label.setText(file_name)
             
             # Tentar abrir o vídeo
-            if self.processor.open_video(file_path):
+            with self.processor.lock:
+                opened = self.processor.open_video(file_path)
+            if opened:
+                self._heatmap_cache.clear()
+                self._video_serial += 1
+                self._heatmap_dirty = True
                 self.status_label.setText(f"Vídeo carregado: {file_name}")
                 
                 # Configurar timeline
                 duration = self.processor.video_duration
-                self.timeline_widget.setTotalDuration(duration)
+                self.timeline_widget.setTotalDuration(duration, self.processor.fps)
                 self.timeline_widget.setRange(0, min(10, duration))
                 
                 # Atualizar variáveis de tempo
@@ -938,12 +1181,9 @@ class VideoHeatmapApp(QMainWindow):
                 new_video_item = QTreeWidgetItem(["◉ " + file_name])
                 new_video_item.setForeground(0, QColor(0, 200, 255))
                 
-                # Encontrar o item VÍDEOS
-                for i in range(self.files_tree.topLevelItemCount()):
-                    if self.files_tree.topLevelItem(i).text(0) == "VÍDEOS":
-                        self.files_tree.topLevelItem(i).addChild(new_video_item)
-                        self.files_tree.expandItem(self.files_tree.topLevelItem(i))
-                        break
+                # Adicionar à categoria VÍDEOS
+                self._videos_node.addChild(new_video_item)
+                self.files_tree.expandItem(self._videos_node)
             else:
                 self.status_label.setText("Erro ao abrir o vídeo")
         
@@ -963,20 +1203,21 @@ class VideoHeatmapApp(QMainWindow):
         threshold = self.threshold_slider.value()
         min_area = self.min_size_spin.value()
         max_area = self.max_size_spin.value()
+        stride = self.stride_spin.value()
         
         # Se o vídeo estiver sendo reproduzido, pare primeiro
-        if hasattr(self, 'play_timer') and self.play_timer.isActive():
-            self.play_timer.stop()
-            self.play_button.setText("▶")
+        if self._playing:
+            self._pause_playback()
         
         # Configurar e iniciar thread de processamento
         self.detection_thread = CursorDetectionThread(
             self.processor, 
             min_area=min_area, 
             max_area=max_area,
-            threshold=threshold
+            threshold=threshold,
+            stride=stride
         )
-        self.detection_thread.progress_updated.connect(self.update_progress)
+        self.detection_thread.progress_updated.connect(self.update_progress, Qt.QueuedConnection)
         self.detection_thread.finished_processing.connect(self.processing_finished)
         
         # Iniciar processamento
@@ -990,37 +1231,35 @@ class VideoHeatmapApp(QMainWindow):
         
     def processing_finished(self, success):
         """Chamado quando o processamento do vídeo termina"""
+        # As posições podem ter mudado mesmo com a mesma contagem (outro passo ou limiar):
+        # invalidar os heatmaps e os frames compostos em cache
+        self._heatmap_cache.clear()
+        self._video_serial += 1
+        self._heatmap_dirty = True
         if success:
-            num_positions = len(self.processor.cursor_positions)
+            num_positions = self.processor.num_cursor_positions
             self.status_label.setText(f"Processamento concluído. {num_positions} posições de cursor detectadas.")
             
             # Preparar dados de intensidade para visualização na timeline
             if num_positions > 0:
-                # Ordenar por tempo
-                sorted_positions = sorted(self.processor.cursor_positions, key=lambda x: x[0])
+                # Posições já ordenadas por tempo, como array (N, 3)
+                positions = self.processor.cursor_positions_array
                 
-                # Gerar dados de heatmap para timeline
-                timeline_data = []
+                # Gerar dados de heatmap para timeline (histograma vetorizado com bincount)
                 max_time = self.processor.video_duration
                 bin_size = max_time / 100  # 100 bins
-                bins = [0] * 100
-                
-                for time, _, _ in sorted_positions:
-                    bin_idx = min(int(time / bin_size), 99)
-                    bins[bin_idx] += 1
+                bin_idx = np.minimum((positions[:, 0] / bin_size).astype(np.int64), 99)
+                bins = np.bincount(bin_idx, minlength=100).astype(np.float64)
                 
                 # Normalizar
-                max_bin = max(bins) if bins else 1
-                for i, count in enumerate(bins):
-                    intensity = count / max_bin
-                    time_point = i * bin_size + (bin_size / 2)  # Centro do bin
-                    timeline_data.append((time_point, intensity))
+                bins /= bins.max() or 1.0
+                centers = (np.arange(100) + 0.5) * bin_size  # Centro de cada bin
                 
                 # Definir dados na timeline
-                self.timeline_widget.setHeatmapData(timeline_data)
+                self.timeline_widget.setHeatmapData(np.column_stack((centers, bins)))
                 
                 # Configurar widget de forma de onda
-                self.waveform_widget.setCursorPositions(sorted_positions)
+                self.waveform_widget.setCursorPositions(positions)
                 self.waveform_widget.setWidthSeconds(max_time)
             
             # Habilitar controles de tempo
@@ -1034,12 +1273,9 @@ class VideoHeatmapApp(QMainWindow):
             processed_item = QTreeWidgetItem(["✓ " + processed_file_name])
             processed_item.setForeground(0, QColor(0, 255, 100))
             
-            # Encontrar o item PROCESSADOS
-            for i in range(self.files_tree.topLevelItemCount()):
-                if self.files_tree.topLevelItem(i).text(0) == "PROCESSADOS":
-                    self.files_tree.topLevelItem(i).addChild(processed_item)
-                    self.files_tree.expandItem(self.files_tree.topLevelItem(i))
-                    break
+            # Adicionar à categoria PROCESSADOS
+            self._processed_node.addChild(processed_item)
+            self.files_tree.expandItem(self._processed_node)
         else:
             self.status_label.setText("Erro durante o processamento.")
             
@@ -1051,149 +1287,233 @@ class VideoHeatmapApp(QMainWindow):
         """Atualiza o intervalo de tempo quando alterado na timeline"""
         self.start_time_window = start
         self.end_time_window = end
+        self._heatmap_dirty = True
         self.update_heatmap_view()
         
     def update_current_position(self, pos):
         """Atualiza a posição atual quando alterada na timeline"""
         self.current_time = pos
         self.update_time_display(pos)
+        self._pending_seek_pos = pos
+        self._pending_seek_exact = True
+        
+        # Na reprodução o frame é composto pela thread de composição
+        if self._playing:
+            self._pending_seek_pos = None
+            box = self._view_box()
+            has_heatmap = self.processor.num_cursor_positions > 0
+            key = "vf-{}-{}-{}-{}-{}x{}".format(
+                id(self), self._video_serial, int(pos * self.processor.fps),
+                hash(self._heatmap_key()) if has_heatmap else 0, box[0], box[1])
+            pixmap = QPixmapCache.find(key)
+            if pixmap is not None:
+                # Frame já composto nesta configuração: apenas exibir
+                self.video_view.setPixmap(pixmap)
+                self._heatmap_dirty = True
+                self._schedule_advance()
+                return
+            self._requested_pixmap_key = (pos, key)
+            self._compositor.request(pos, self._get_heatmap() if has_heatmap else None, box)
+        elif not self._seek_timer.isActive():
+            self._seek_timer.start()
+            
+    def _preview_position(self, pos):
+        """Pré-visualização durante o arraste: apenas o frame, sem gerar o heatmap"""
+        self.current_time = pos
+        self.update_time_display(pos)
+        self._pending_seek_pos = pos
+        self._pending_seek_exact = False
+        if not self._seek_timer.isActive():
+            self._seek_timer.start()
+            
+    def _do_seek(self):
+        """Exibe o frame (com heatmap) da última posição solicitada na timeline"""
+        pos = self._pending_seek_pos
+        if pos is None:
+            return
+        self._pending_seek_pos = None
         
         # Atualizar frame
-        frame = self.processor.get_frame_at_time(pos)
-        if frame is not None:
-            if self.processor.cursor_positions:
-                # Gerar heatmap
-                heatmap = self.processor.generate_heatmap(
-                    self.start_time_window, 
-                    self.end_time_window,
-                    self.resolution_slider.value()
-                )
+        with self.processor.lock:
+            frame = self.processor.get_frame_at_time(pos)
+            if frame is not None:
+                frame = _prescale(frame, self._view_box())
+                if self._pending_seek_exact and self.processor.num_cursor_positions:
+                    # Gerar heatmap
+                    heatmap = self._get_heatmap()
                 
-                # Aplicar heatmap ao frame
-                result = self.processor.apply_heatmap_to_frame(frame, heatmap)
+                    # Aplicar heatmap ao frame
+                    result = self.processor.apply_heatmap_to_frame(frame, heatmap)
                 
-                # Exibir resultado
-                self.display_frame(result)
-            else:
-                # Se não houver posições, apenas exibir o frame
-                self.display_frame(frame)
+                    # Exibir resultado
+                    self.display_frame(result)
+                else:
+                    # Se não houver posições, apenas exibir o frame
+                    self.display_frame(frame)
+                self._heatmap_dirty = not self._pending_seek_exact
                 
     def update_time_display(self, seconds):
         """Atualiza a exibição de tempo no formato DaVinci Resolve (HH:MM:SS.FF)"""
         hours = int(seconds // 3600)
         minutes = int((seconds % 3600) // 60)
         secs = int(seconds % 60)
-        frames = int((seconds % 1) * 30)  # Assumindo 30fps
+        fps = self.processor.fps or 30  # 30fps enquanto nenhum vídeo foi aberto
+        frames = int((seconds % 1) * fps)
         
         self.time_display.setText(f"{hours:02d}:{minutes:02d}:{secs:02d}.{frames:02d}")
         
     def toggle_play(self):
         """Inicia ou pausa a reprodução com melhor taxa de frames"""
-        if hasattr(self, 'play_timer') and self.play_timer.isActive():
-            self.play_timer.stop()
-            self.play_button.setText("▶")
+        if self._playing:
+            self._pause_playback()
         else:
-            # Configurar timer para avançar a timeline
-            self.play_timer = QTimer()
-            self.play_timer.timeout.connect(self.advance_timeline)
+            self._playing = True
             
-            # Resetar o tempo da última atualização
-            self.last_update_time = time.time()
+            # Relógio monotônico da reprodução, medido a partir da posição atual
+            self._playback_elapsed = QElapsedTimer()
+            self._playback_elapsed.start()
+            self._playback_start_pos = self.timeline_widget.getCurrentPosition()
+            self._playback_pos = self._playback_start_pos
+            self._last_frame_idx = int(self._playback_start_pos * self.processor.fps)
             
-            # Usar um intervalo menor para atualização mais frequente
-            self.play_timer.start(16)  # Aproximadamente 60fps (~16.67ms)
+            # Primeiro avanço imediato; os seguintes seguem a exibição de cada frame
+            self.play_timer.start(0)
             self.play_button.setText("⏸")
             
             # Desativar o processamento pesado durante a reprodução
             if hasattr(self, 'play_mode_original'):
                 self.play_mode_original = True
             
+    def _pause_playback(self):
+        """Interrompe a reprodução na posição atual"""
+        self._playing = False
+        self.play_timer.stop()
+        self.play_button.setText("▶")
+        
     def stop_playback(self):
         """Para a reprodução e volta ao início"""
-        if hasattr(self, 'play_timer') and self.play_timer.isActive():
-            self.play_timer.stop()
-            self.play_button.setText("▶")
+        if self._playing:
+            self._pause_playback()
+        elif self.timeline_widget.getCurrentPosition() == 0 and not self._heatmap_dirty:
+            # Já parado no início com o heatmap atualizado: nada a refazer
+            return
             
         # Voltar para o início
         self.timeline_widget.setCurrentPosition(0)
         self.current_time = 0
         self.update_time_display(0)
+        self._pending_seek_pos = None  # O frame é exibido abaixo
         
         # Atualizar frame
-        frame = self.processor.get_frame_at_time(0)
-        if frame is not None:
-            if self.processor.cursor_positions:
-                # Gerar heatmap
-                heatmap = self.processor.generate_heatmap(
-                    self.start_time_window, 
-                    self.end_time_window,
-                    self.resolution_slider.value()
-                )
+        with self.processor.lock:
+            frame = self.processor.get_frame_at_time(0)
+            if frame is not None:
+                frame = _prescale(frame, self._view_box())
+                if self.processor.num_cursor_positions:
+                    # Gerar heatmap
+                    heatmap = self._get_heatmap()
                 
-                # Aplicar heatmap ao frame
-                result = self.processor.apply_heatmap_to_frame(frame, heatmap)
+                    # Aplicar heatmap ao frame
+                    result = self.processor.apply_heatmap_to_frame(frame, heatmap)
                 
-                # Exibir resultado
-                self.display_frame(result)
-            else:
-                # Se não houver posições, apenas exibir o frame
-                self.display_frame(frame)
+                    # Exibir resultado
+                    self.display_frame(result)
+                else:
+                    # Se não houver posições, apenas exibir o frame
+                    self.display_frame(frame)
+                self._heatmap_dirty = False
             
     def advance_timeline(self):
         """Avança a posição atual na timeline com melhor performance"""
-        if not hasattr(self, 'last_update_time'):
-            self.last_update_time = time.time()
-            
-        # Calcular tempo real decorrido desde a última atualização
-        current_time = time.time()
-        elapsed = current_time - self.last_update_time
-        self.last_update_time = current_time
+        if not self._playing:
+            return
+        self._tick_clock.start()
         
-        # Usar o tempo real decorrido para avançar a timeline
-        # multiplicado pelo FPS do vídeo para reprodução em velocidade correta
+        # Posição alterada pelo usuário durante a reprodução: recomeçar a contagem dali
         current_pos = self.timeline_widget.getCurrentPosition()
-        next_pos = current_pos + (elapsed * 1.0)  # Fator 1.0 para velocidade normal
+        if current_pos != self._playback_pos:
+            self._playback_start_pos = current_pos
+            self._playback_elapsed.restart()
+            
+        # Posição derivada do tempo real decorrido desde o início (sem acumular erro)
+        next_pos = self._playback_start_pos + self._playback_elapsed.elapsed() / 1000.0
         
         if next_pos >= self.processor.video_duration:
             # Chegou ao fim do vídeo, parar reprodução
-            self.play_timer.stop()
-            self.play_button.setText("▶")
+            self._pause_playback()
             return
             
-        # Atualizar posição
+        # Ainda no mesmo frame do vídeo: nada novo para exibir
+        frame_idx = int(next_pos * self.processor.fps)
+        if frame_idx == self._last_frame_idx:
+            self._schedule_advance()
+            return
+        self._last_frame_idx = frame_idx
+        
+        # Atualizar posição (o próximo avanço é agendado quando o frame ficar pronto)
+        self._playback_pos = next_pos
+        if next_pos == current_pos:
+            # Logo após recomeçar a contagem a posição não muda: a timeline não emite
+            # positionChanged, nenhum frame é composto e não haveria renderDone
+            self._schedule_advance()
+            return
         self.timeline_widget.setCurrentPosition(next_pos)
         
+    def _schedule_advance(self):
+        """Agenda o próximo avanço da reprodução, no máximo a cada 16 ms (~60 fps)"""
+        if self._playing:
+            self.play_timer.start(max(0, 16 - self._tick_clock.elapsed()))
+        
+    def _heatmap_key(self):
+        """Janela e parâmetros que determinam o heatmap exibido"""
+        return (self.start_time_window, self.end_time_window, self.resolution_slider.value(),
+                self.blur_slider.value(), self.colormap_combo.currentText(),
+                self.processor.decay_factor, self.processor.num_cursor_positions)
+        
+    def _get_heatmap(self):
+        """Retorna o heatmap da janela atual, reutilizando os 8 mais recentes"""
+        key = self._heatmap_key()
+        heatmap = self._heatmap_cache.get(key)
+        if heatmap is None:
+            # O processador reutiliza o buffer retornado: guardar uma cópia
+            heatmap = self.processor.generate_heatmap(key[0], key[1], key[2]).copy()
+            self._heatmap_cache[key] = heatmap
+            if len(self._heatmap_cache) > 8:
+                self._heatmap_cache.popitem(last=False)
+        else:
+            self._heatmap_cache.move_to_end(key)
+        return heatmap
+        
     def update_heatmap_view(self):
         """Atualiza a visualização do heatmap"""
         # Obter frame na posição atual
         current_pos = self.timeline_widget.getCurrentPosition()
-        frame = self.processor.get_frame_at_time(current_pos)
-        if frame is None:
-            return
+        with self.processor.lock:
+            frame = self.processor.get_frame_at_time(current_pos)
+            if frame is None:
+                return
+            frame = _prescale(frame, self._view_box())
+                
+            # Verificar se há dados de cursor
+            if not self.processor.num_cursor_positions:
+                # Apenas exibir o frame sem heatmap
+                self.display_frame(frame)
+                self._heatmap_dirty = False
+                self.status_label.setText("Nenhuma posição de cursor detectada. Execute o processamento primeiro.")
+                return
+                
+            # Gerar heatmap para a janela de tempo atual
+            heatmap = self._get_heatmap()
             
-        # Verificar se há dados de cursor
-        if not self.processor.cursor_positions:
-            # Apenas exibir o frame sem heatmap
-            self.display_frame(frame)
-            self.status_label.setText("Nenhuma posição de cursor detectada. Execute o processamento primeiro.")
-            return
+            # Aplicar heatmap ao frame
+            result = self.processor.apply_heatmap_to_frame(frame, heatmap)
             
-        # Gerar heatmap para a janela de tempo atual
-        heatmap = self.processor.generate_heatmap(
-            self.start_time_window, 
-            self.end_time_window,
-            self.resolution_slider.value()
-        )
-        
-        # Aplicar heatmap ao frame
-        result = self.processor.apply_heatmap_to_frame(frame, heatmap)
-        
-        # Exibir resultado
-        self.display_frame(result)
+            # Exibir resultado
+            self.display_frame(result)
+            self._heatmap_dirty = False
         
         # Atualizar status
-        num_points = sum(1 for t, _, _ in self.processor.cursor_positions 
-                        if self.start_time_window <= t <= self.end_time_window)
+        num_points = self.processor.count_cursor_positions(self.start_time_window, self.end_time_window)
         
         self.status_label.setText(
             f"Exibindo heatmap de {self.start_time_window:.1f}s a {self.end_time_window:.1f}s "
@@ -1207,62 +1527,104 @@ class VideoHeatmapApp(QMainWindow):
             
         h, w, c = frame.shape
         
-        # Converter BGR para RGB (importante para cores corretas)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Converter para QImage com formato correto
-        q_img = QImage(frame_rgb.data, w, h, w * c, QImage.Format_RGB888)
+        if _FORMAT_BGR888 is not None:
+            # Qt 5.14+: o QImage lê o frame BGR do OpenCV diretamente (fromImage copia os dados)
+            frame = np.ascontiguousarray(frame)
+            q_img = QImage(frame.data, w, h, w * c, _FORMAT_BGR888)
+        else:
+            # Converter BGR para RGB (importante para cores corretas) em um buffer reutilizado
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty_like(frame)
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+            q_img = QImage(frame_rgb.data, w, h, w * c, QImage.Format_RGB888)
+        self._show_image(q_img)
+        
+        # Salvar o frame atual para possível uso posterior (os buffers do processador são
+        # reutilizados, então o conteúdo é copiado para um buffer próprio, sem nova alocação)
+        if frame is not self._display_buf:
+            if self._display_buf is None or self._display_buf.shape != frame.shape:
+                self._display_buf = np.empty_like(frame)
+            np.copyto(self._display_buf, frame)
+        self._hold_frame(self._display_buf)
+        
+    def _hold_frame(self, frame):
+        """Guarda o frame exibido, devolvendo à thread de composição o buffer anterior"""
+        previous = getattr(self, 'current_frame', None)
+        self.current_frame = frame
+        if previous is not None and previous is not frame and previous is not self._display_buf:
+            self._compositor.release(previous)
+        
+    def _show_composited_frame(self, image, frame, pos):
+        """Exibe um frame entregue pela thread de composição"""
+        # Frames atrasados após a pausa (ou de outra posição) são descartados
+        if not self._playing and pos != self.current_time:
+            self._compositor.release(frame)
+            return
+        pixmap = self._show_image(image)
+        self._hold_frame(frame)  # Buffer da thread de composição, mantido até o próximo
+        if self._requested_pixmap_key is not None and self._requested_pixmap_key[0] == pos:
+            QPixmapCache.insert(self._requested_pixmap_key[1], pixmap)
+        self._heatmap_dirty = True
+        
+    def _view_box(self):
+        """Tamanho (largura, altura) da área disponível para exibir o vídeo"""
+        # Obter tamanho da área visível (considerando o layout), com um mínimo garantido
+        return max(self.video_view.width(), 640), max(self.video_view.height(), 360)
+        
+    def _show_image(self, q_img):
+        """Escala a imagem para a área de vídeo, a exibe e retorna o pixmap exibido"""
         pixmap = QPixmap.fromImage(q_img)
-        
-        # Obter tamanho do widget
-        label_width = self.video_view.width()
-        label_height = self.video_view.height()
-        
-        # Obter tamanho da área visível (considerando o layout)
-        available_width = max(label_width, 640)  # Garantir largura mínima
-        available_height = max(label_height, 360)  # Garantir altura mínima
-        
-        # Ajustar ao tamanho disponível mantendo proporção
-        scaled_pixmap = pixmap.scaled(
-            available_width, 
-            available_height,
-            Qt.KeepAspectRatio, 
-            Qt.SmoothTransformation  # Qualidade alta
-        )
-        
-        # Limpar qualquer pixmap anterior para garantir inicialização correta
-        self.video_view.clear()
-        
-        # Centralizar a imagem no label
-        self.video_view.setAlignment(Qt.AlignCenter)
-        self.video_view.setPixmap(scaled_pixmap)
-        
-        # Forçar atualização da interface para garantir que o frame seja exibido corretamente
-        self.video_view.update()
-        
-        # Salvar o frame atual para possível uso posterior
-        self.current_frame = frame.copy()  # Criar uma cópia para evitar problemas de referência
+        available_width, available_height = self._view_box()
+        
+        # Ajustar ao tamanho disponível mantendo proporção (qualidade alta quando parado,
+        # escala rápida durante a reprodução); frames já compostos no tamanho de exibição
+        # são exibidos sem nova escala
+        target = pixmap.size().scaled(available_width, available_height, Qt.KeepAspectRatio)
+        if target != pixmap.size():
+            pixmap = pixmap.scaled(
+                target,
+                Qt.IgnoreAspectRatio,
+                Qt.FastTransformation if self._playing else Qt.SmoothTransformation
+            )
+        
+        # O novo pixmap substitui o anterior (a centralização é definida na criação do label)
+        self.video_view.setPixmap(pixmap)
+        return pixmap
         
     def update_blur(self, value):
         """Atualizar tamanho do blur"""
-        # Garantir que é ímpar
-        if value % 2 == 0:
-            value += 1
+        # Garantir que é ímpar (sem reentrar neste slot ao corrigir o slider)
+        if not value & 1:
+            value |= 1
+            blocker = QSignalBlocker(self.blur_slider)
             self.blur_slider.setValue(value)
+            blocker.unblock()
+        # Valor par arredondado para o blur já aplicado: nada muda
+        if value == self.processor.blur_size:
+            return
         self.blur_value.setText(str(value))
         self.processor.set_blur_size(value)
-        self.update_heatmap_view()
+        self._heatmap_dirty = True
+        self._settings_timer.start()
         
     def update_resolution(self, value):
         """Atualizar resolução do heatmap"""
         self.resolution_value.setText(str(value))
-        self.update_heatmap_view()
+        self._heatmap_dirty = True
+        self._settings_timer.start()
         
     def update_colormap(self, index):
         """Atualizar esquema de cores do heatmap"""
-        colormap = self.colormap_combo.currentText()
-        self.processor.set_colormap(colormap)
-        self.update_heatmap_view()
+        # Passar a constante do OpenCV já resolvida
+        self.processor.set_colormap(COLORMAPS[self.colormap_combo.currentText()])
+        self._heatmap_dirty = True
+        self._settings_timer.start()
+        
+    def _flush_settings(self):
+        """Aplica imediatamente uma mudança de configuração ainda pendente (slider solto)"""
+        if self._settings_timer.isActive():
+            self._settings_timer.stop()
+            self.update_heatmap_view()
         
     def take_screenshot(self):
         """Capturar um frame e salvar como imagem"""
@@ -1280,21 +1642,18 @@ class VideoHeatmapApp(QMainWindow):
                 self.status_label.setText(f"Captura salva em {file_path}")
                 
                 # Adicionar ao tree widget
-                capture_file_name = file_path.split("/")[-1]
+                capture_file_name = os.path.basename(file_path)
                 capture_item = QTreeWidgetItem(["📷 " + capture_file_name])
                 capture_item.setForeground(0, QColor(220, 220, 100))
                 
-                # Encontrar o item PROCESSADOS
-                for i in range(self.files_tree.topLevelItemCount()):
-                    if self.files_tree.topLevelItem(i).text(0) == "PROCESSADOS":
-                        self.files_tree.topLevelItem(i).addChild(capture_item)
-                        self.files_tree.expandItem(self.files_tree.topLevelItem(i))
-                        break
+                # Adicionar à categoria PROCESSADOS
+                self._processed_node.addChild(capture_item)
+                self.files_tree.expandItem(self._processed_node)
             
     def export_data(self):
         """Exportar dados de cursor para arquivo JSON"""
         # Verificar se há dados para exportar
-        if not self.processor.cursor_positions:
+        if not self.processor.num_cursor_positions:
             QMessageBox.warning(self, "Sem Dados", 
                               "Não há dados de cursor para exportar. Execute o processamento primeiro.")
             return
@@ -1306,7 +1665,9 @@ class VideoHeatmapApp(QMainWindow):
         )
         
         if file_path:
-            # Preparar dados para exportação
+            # Preparar dados para exportação (posições em colunas, direto dos arrays
+            # do processador, sem montar uma lista de tuplas)
+            ts, xs, ys = self.processor.cursor_position_columns()
             data = {
                 "video_info": {
                     "width": self.processor.width,
@@ -1315,7 +1676,7 @@ class VideoHeatmapApp(QMainWindow):
                     "fps": self.processor.fps,
                     "filename": self.current_file_label.text()
                 },
-                "cursor_positions": self.processor.cursor_positions,
+                "cursor_positions": {"t": ts, "x": xs, "y": ys},
                 "heatmap_range": {
                     "start": self.start_time_window,
                     "end": self.end_time_window
@@ -1327,23 +1688,25 @@ class VideoHeatmapApp(QMainWindow):
                 }
             }
             
-            # Salvar como JSON
+            # Salvar como JSON (serializado em C pelo orjson, quando disponível)
             try:
-                with open(file_path, 'w') as f:
-                    json.dump(data, f)
+                if orjson is not None:
+                    with open(file_path, 'wb') as f:
+                        f.write(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY))
+                else:
+                    data["cursor_positions"] = {"t": ts.tolist(), "x": xs.tolist(), "y": ys.tolist()}
+                    with open(file_path, 'w') as f:
+                        json.dump(data, f)
                 self.status_label.setText(f"Dados exportados para {file_path}")
                 
                 # Adicionar ao tree widget
-                export_file_name = file_path.split("/")[-1]
+                export_file_name = os.path.basename(file_path)
                 export_item = QTreeWidgetItem(["💾 " + export_file_name])
                 export_item.setForeground(0, QColor(100, 200, 255))
                 
-                # Encontrar o item PROCESSADOS
-                for i in range(self.files_tree.topLevelItemCount()):
-                    if self.files_tree.topLevelItem(i).text(0) == "PROCESSADOS":
-                        self.files_tree.topLevelItem(i).addChild(export_item)
-                        self.files_tree.expandItem(self.files_tree.topLevelItem(i))
-                        break
+                # Adicionar à categoria PROCESSADOS
+                self._processed_node.addChild(export_item)
+                self.files_tree.expandItem(self._processed_node)
             except Exception as e:
                 QMessageBox.critical(self, "Erro ao Exportar", f"Erro ao salvar arquivo: {str(e)}")
     
@@ -1351,31 +1714,41 @@ class VideoHeatmapApp(QMainWindow):
         """Lidar com redimensionamento da janela com atualização imediata"""
         super().resizeEvent(event)
         
-        # Aguardar um momento para que o layout seja atualizado
-        QTimer.singleShot(50, self.update_after_resize)
+        # Aguardar o layout ser atualizado; cada novo evento reinicia a espera
+        self._resize_timer.start()
         
     def update_after_resize(self):
         """Atualiza o frame após o redimensionamento da janela"""
         # Atualizar frame se houver algum exibido
         if hasattr(self, 'current_frame') and self.current_frame is not None:
-            self.display_frame(self.current_frame)
+            if self._playing:
+                self.display_frame(self.current_frame)
+            else:
+                # O frame exibido foi composto no tamanho anterior: recompor a partir do vídeo
+                self._pending_seek_pos = self.timeline_widget.getCurrentPosition()
+                self._pending_seek_exact = True
+                self._do_seek()
     
     def safe_release_resources(self):
         """Libera recursos de forma segura para prevenir erros de thread"""
-        # Primeiro pare o timer, se existir
-        if hasattr(self, 'play_timer') and self.play_timer.isActive():
-            self.play_timer.stop()
-        
-        # Espere um pouco para garantir que os timers pararam
-        QApplication.processEvents()
-        
-        # Se tiver uma thread rodando, termine e espere
+        # Primeiro pare os timers
+        if self._playing:
+            self._pause_playback()
+        self._seek_timer.stop()
+        self._settings_timer.stop()
+        self._resize_timer.stop()
+        
+        # Se tiver uma thread rodando, pedir a interrupção (verificada a cada frame) e esperar
         if hasattr(self, 'detection_thread') and self.detection_thread.isRunning():
-            # Espera com timeout de 1 segundo
-            self.detection_thread.wait(1000)
-            if self.detection_thread.isRunning():
+            self.detection_thread.requestInterruption()
+            if not self.detection_thread.wait(2000):
                 self.detection_thread.terminate()
+                self.detection_thread.wait(500)
         
+        # Encerrar a thread de composição antes de liberar a captura
+        if hasattr(self, '_compositor'):
+            self._compositor.stop()
+            
         # Liberar recursos de vídeo por último
         if hasattr(self, 'processor') and self.processor and hasattr(self.processor, 'cap') and self.processor.cap:
             self.processor.cap.release()
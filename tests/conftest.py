@@ -0,0 +1,40 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processor import VideoHeatmapProcessor
+
+VIDEO_SIZE = (160, 120)  # (largura, altura)
+VIDEO_FPS = 10.0
+VIDEO_FRAMES = 101
+
+
+@pytest.fixture(scope="session")
+def video_path(tmp_path_factory):
+    """Vídeo sintético sem perdas: um quadrado que se desloca 4 px por frame"""
+    path = str(tmp_path_factory.mktemp("video") / "cursor.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"FFV1"), VIDEO_FPS, VIDEO_SIZE)
+    if not writer.isOpened():
+        pytest.skip("codec FFV1 indisponível no OpenCV")
+    width, height = VIDEO_SIZE
+    for i in range(VIDEO_FRAMES):
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        x = 10 + (4 * i) % (width - 30)
+        frame[50:58, x:x + 8] = 255
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def processor(video_path):
+    """Processador com o vídeo sintético aberto"""
+    proc = VideoHeatmapProcessor()
+    assert proc.open_video(video_path)
+    yield proc
+    proc.release()
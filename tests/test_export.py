@@ -0,0 +1,40 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("PyQt5")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QFileDialog
+
+import src.ui as ui
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_export_writes_position_columns(app, processor, tmp_path, monkeypatch, use_orjson):
+    """As posições são exportadas em colunas paralelas t, x e y"""
+    if use_orjson and ui.orjson is None:
+        pytest.skip("orjson não instalado")
+    if not use_orjson:
+        monkeypatch.setattr(ui, "orjson", None)
+    out = tmp_path / "dados.json"
+    monkeypatch.setattr(QFileDialog, "getSaveFileName", staticmethod(lambda *a, **k: (str(out), "")))
+
+    window = ui.VideoHeatmapApp()
+    try:
+        window.processor = processor
+        for t, x, y in [(0.0, 10, 20), (0.5, 30, 40), (1.0, 50, 60)]:
+            processor.add_cursor_position(t, x, y)
+        window.export_data()
+    finally:
+        window.close()
+
+    data = json.loads(out.read_text())
+    assert data["cursor_positions"] == {"t": [0.0, 0.5, 1.0], "x": [10, 30, 50], "y": [20, 40, 60]}
+    assert data["video_info"]["fps"] == processor.fps
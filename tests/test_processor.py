@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from src.processor import VideoHeatmapProcessor
+
+from conftest import VIDEO_FPS, VIDEO_FRAMES
+
+
+def _square_frame(value, x=60):
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    frame[40:64, x:x + 24] = value
+    return frame
+
+
+def _add_track(proc, times):
+    for t in times:
+        proc.add_cursor_position(float(t), int(20 + 600 * t) % 150, 60)
+
+
+def test_detection_ignores_slow_fade():
+    """Mudanças abaixo do limiar a cada frame não se acumulam em falsas detecções"""
+    proc = VideoHeatmapProcessor()
+    results = [proc.detect_cursor_from_difference(_square_frame(min(255, 8 * i)), threshold=15)
+               for i in range(20)]
+    assert results == [(-1, -1)] * 20
+
+
+def test_detection_finds_appearing_cursor():
+    proc = VideoHeatmapProcessor()
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    assert proc.detect_cursor_from_difference(frame) == (-1, -1)
+    frame[40:48, 60:68] = 255
+    x, y = proc.detect_cursor_from_difference(frame)
+    assert abs(x - 64) <= 1 and abs(y - 44) <= 1
+
+
+def test_incremental_decay_matches_rebuild(processor):
+    processor.decay_factor = 0.9
+    _add_track(processor, np.arange(0, 8, 0.1))
+    processor.generate_heatmap(0, 2.5)
+    processor.generate_heatmap(0, 5.0)
+    incremental = processor.generate_heatmap(0, 7.5).copy()
+
+    processor._hm_range = None  # Forçar a reconstrução do zero
+    rebuilt = processor.generate_heatmap(0, 7.5)
+    assert incremental.max() > 0
+    np.testing.assert_array_equal(incremental, rebuilt)
+
+
+def test_decay_does_not_depend_on_sample_density(processor, video_path):
+    """O decaimento conta frames decorridos, não amostras: duplicá-las não muda o mapa"""
+    times = np.arange(0, 5, 0.2)
+    processor.decay_factor = 0.9
+    _add_track(processor, times)
+
+    dense = VideoHeatmapProcessor(decay_factor=0.9)
+    assert dense.open_video(video_path)
+    _add_track(dense, np.repeat(times, 3))
+
+    np.testing.assert_array_equal(processor.generate_heatmap(0, 5), dense.generate_heatmap(0, 5))
+    dense.release()
+
+
+def test_position_columns_match_positions(processor):
+    _add_track(processor, [0.0, 0.5, 1.0])
+    ts, xs, ys = processor.cursor_position_columns()
+    assert list(zip(ts.tolist(), xs.tolist(), ys.tolist())) == processor.cursor_positions
+    assert processor.count_cursor_positions(0.25, 1.0) == 2
+
+
+def test_strided_detection_progress_reaches_100(processor):
+    """Com stride que não divide a contagem de frames a barra ainda termina em 100"""
+    assert VIDEO_FRAMES % 3 != 0
+    progress = []
+    processor.detect_cursor_positions(stride=3, progress=progress.append)
+    assert progress[-1] == 100
+    assert progress.count(100) == 1
+    assert progress == sorted(progress)
+
+
+def test_stopped_detection_keeps_partial_progress(processor):
+    progress = []
+    calls = []
+
+    def should_stop():
+        calls.append(None)
+        return len(calls) > 10
+
+    processor.detect_cursor_positions(stride=3, progress=progress.append, should_stop=should_stop)
+    assert 0 < progress[-1] < 100
+
+
+def test_detection_uses_video_frame_rate(processor):
+    processor.detect_cursor_positions()
+    ts, xs, ys = processor.cursor_position_columns()
+    assert len(ts) > 0
+    np.testing.assert_allclose(ts * VIDEO_FPS, np.rint(ts * VIDEO_FPS))